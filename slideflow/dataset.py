@@ -82,27 +82,30 @@ overview of the structure of the Dataset class is as follows:
             └───────┘ └────────────────┘
 '''
 
-import copy
 import csv
+import errno
+import json
 import multiprocessing
 import os
+import random
 import shutil
 import threading
 import time
 import types
-from collections import defaultdict
+from collections import Counter, defaultdict
 from datetime import datetime
+from functools import lru_cache, partial
 from glob import glob
+from itertools import chain
 from multiprocessing.dummy import Pool as DPool
-from os.path import basename, dirname, exists, isdir, join
+from os.path import abspath, basename, dirname, exists, isdir, join
 from queue import Queue
-from random import shuffle
-from typing import (TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple,
-                    Union)
+from types import MappingProxyType
+from typing import (TYPE_CHECKING, Any, Dict, List, Mapping, Optional,
+                    Sequence, Tuple, Union)
 
 import numpy as np
 import pandas as pd
-import shapely.geometry as sg
 from tqdm import tqdm
 
 import slideflow as sf
@@ -114,11 +117,41 @@ from slideflow.util import colors as col
 from slideflow.util import log, path_to_name, tfrecord2idx
 
 if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+
     import tensorflow as tf
     from torch.utils.data import DataLoader
 
     from slideflow.norm import StainNormalizer
 
+try:
+    from shapely import contains_xy  # Shapely >= 2.0
+except ImportError:
+    from shapely.vectorized import contains as contains_xy
+
+# Number of slides a tile extraction process will handle before exiting.
+_MAX_SLIDES_PER_PROCESS = 8
+
+# Number of threads concurrently copying slides into the extraction buffer.
+_NUM_BUFFER_COPIERS = 4
+
+# Name of the cache of estimated tiles per slide, stored alongside the
+# dataset configuration file.
+_TILE_ESTIMATES_CACHE = 'estimated_tiles.json'
+
+# Values read as NaN from annotation CSVs, matching pandas' defaults.
+_ANNOTATION_NA_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a',
+    'nan', 'null'
+]
+
+# Number of records buffered per batched ROI containment test.
+_ROI_SPLIT_BATCH = 1024
+
+# Annotation values treated as blank.
+_EMPTY_ANNOTATIONS = frozenset(sf.util.EMPTY_ANNOTATIONS)
+
 
 def _tile_extractor(
     path: str,
@@ -182,42 +215,404 @@ def _tile_extractor(
         raise e
 
 
+def _extraction_process(conn: "Connection", extraction_kwargs: Dict) -> None:
+    """Long-lived tile extraction process, used when num_workers > 1.
+
+    Receives slide paths over a pipe and replies once each slide is done,
+    exiting after _MAX_SLIDES_PER_PROCESS slides (or when sent None) so
+    that memory held by slide readers and TFRecord writers is released.
+
+    Args:
+        conn (multiprocessing.connection.Connection): Child end of a pipe.
+        extraction_kwargs (dict): Keyword arguments for _tile_extractor().
+    """
+    for _ in range(_MAX_SLIDES_PER_PROCESS):
+        path = conn.recv()
+        if path is None:
+            break
+        _tile_extractor(path, **extraction_kwargs)
+        conn.send(True)
+    conn.close()
+
+
+def _in_rois(
+    polys: Sequence[Any],
+    loc_x: np.ndarray,
+    loc_y: np.ndarray
+) -> np.ndarray:
+    """Returns a boolean mask of the locations inside any of the polygons.
+
+    Each polygon is tested against all locations at once, rather than
+    testing each location against each polygon.
+    """
+    mask = np.zeros(len(loc_x), dtype=bool)
+    for poly in polys:
+        mask |= contains_xy(poly, loc_x, loc_y)
+    return mask
+
+
+def _split_tfrecord_by_roi(
+    tfr_and_slide: Tuple[str, str],
+    rois: List[str],
+    tile_px: int,
+    tile_um: Union[int, str],
+    destination: str,
+    pb: Optional[tqdm] = None
+) -> None:
+    """Splits a tfrecord into tiles inside and outside the slide's ROIs.
+
+    Writes tfrecords of the same name to the 'inside' and 'outside'
+    subfolders of the destination. Defined at the module level so that
+    it can be used with a thread pool.
+
+    Args:
+        tfr_and_slide (tuple(str, str)): Paths to the tfrecord and slide.
+        rois (list(str)): Paths to ROI CSV files.
+        tile_px (int): Tile size in pixels.
+        tile_um (int or str): Tile size in microns or magnification.
+        destination (str): Destination path.
+        pb (tqdm, optional): Progress bar, updated for every tile written.
+            Defaults to None.
+    """
+    tfr, slide_path = tfr_and_slide
+    slidename = path_to_name(tfr)
+    try:
+        slide = WSI(
+            slide_path,
+            tile_px,
+            tile_um,
+            rois=rois,
+            roi_method='inside'
+        )
+    except errors.SlideLoadError as e:
+        log.error(e)
+        return
+    parser = sf.io.get_tfrecord_parser(
+        tfr,
+        decode_images=False,
+        to_numpy=True
+    )
+    if parser is None:
+        log.error(f"Could not read TFRecord {tfr}; skipping")
+        return
+    reader = sf.io.TFRecordDataset(tfr)
+    in_path = join(destination, 'inside', f'{slidename}.tfrecords')
+    out_path = join(destination, 'outside', f'{slidename}.tfrecords')
+    inside_roi_writer = sf.io.TFRecordWriter(in_path)
+    outside_roi_writer = sf.io.TFRecordWriter(out_path)
+    # Tensorflow yields serialized records; PyTorch yields records
+    # that have already been parsed into features.
+    serialized = (sf.backend() == 'tensorflow')
+
+    def write_batch(records, locations):
+        locations = np.array(locations, dtype=float).reshape(-1, 2)
+        in_roi = _in_rois(slide.annPolys, locations[:, 0], locations[:, 1])
+        for record, tile_in_roi in zip(records, in_roi):
+            if serialized:
+                # Write the serialized record as read, rather than
+                # parsing and re-serializing it.
+                record_bytes = record.numpy()
+            else:
+                record_bytes = sf.io.read_and_return_record(record, parser)
+            if tile_in_roi:
+                inside_roi_writer.write(record_bytes)
+            else:
+                outside_roi_writer.write(record_bytes)
+        if pb is not None:
+            pb.update(len(records))
+
+    # Test ROI containment in batches of records
+    records, locations = [], []
+    for record in reader:
+        parsed = parser(record)
+        records.append(record)
+        locations.append((parsed['loc_x'], parsed['loc_y']))
+        if len(records) == _ROI_SPLIT_BATCH:
+            write_batch(records, locations)
+            records, locations = [], []
+    if records:
+        write_batch(records, locations)
+    inside_roi_writer.close()
+    outside_roi_writer.close()
+
+
+def _save_thumbnail(
+    slide_path: str,
+    outdir: str,
+    size: int,
+    roi: bool,
+    enable_downsample: bool,
+    rois: List[str]
+) -> None:
+    """Saves a thumbnail of a slide to the given directory.
+
+    Defined at the module level so that it can be used with a
+    multiprocessing pool.
+    """
+    try:
+        whole_slide = WSI(slide_path,
+                          tile_px=1000,
+                          tile_um=1000,
+                          stride_div=1,
+                          enable_downsample=enable_downsample,
+                          rois=rois,
+                          roi_method='inside' if roi else 'auto')
+    except errors.MissingROIError:
+        log.info(f"Skipping {path_to_name(slide_path)}; missing ROI")
+        return
+    if roi:
+        thumb = whole_slide.thumb(rois=True)
+    else:
+        thumb = whole_slide.square_thumb(size)
+    thumb.save(join(outdir, f'{whole_slide.name}.png'))
+
+
+def _append_split(splits_file: str, splits: List[Dict]) -> None:
+    """Saves splits to a splits file, where only the last split is new.
+
+    The splits file is a JSON list. If it already holds the earlier
+    splits, the new split is written over the closing bracket, rather than
+    rewriting the whole file. Otherwise, the file is written in full.
+    """
+    if len(splits) > 1 and exists(splits_file):
+        entry = json.dumps(splits[-1], indent=1)
+        entry = '\n'.join(' ' + line for line in entry.splitlines())
+        with open(splits_file, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            start = f.seek(max(0, size - 64))
+            tail = f.read().rstrip()
+            if tail.endswith(b']'):
+                f.seek(start + len(tail[:-1].rstrip()))
+                f.write(f',\n{entry}\n]'.encode('utf-8'))
+                f.truncate()
+                return
+    sf.util.write_json(splits, splits_file)
+
+
+def _create_index(tfrecord: str) -> None:
+    """Creates an index file for a TFRecord, saved in the same directory.
+
+    Defined at the module level so that it can be used with a
+    multiprocessing pool.
+    """
+    index_name = join(dirname(tfrecord), path_to_name(tfrecord)+'.index')
+    tfrecord2idx.create_index(tfrecord, index_name)
+
+
+def _load_index(
+    tfrecord: str,
+    mmap_mode: Optional[str] = None
+) -> Tuple[str, Optional[np.ndarray]]:
+    """Loads the index file for a TFRecord, returning (name, index).
+
+    Defined at the module level so that it can be used with a
+    multiprocessing pool.
+    """
+    index_name = join(dirname(tfrecord), path_to_name(tfrecord)+'.index')
+    try:
+        index = tfrecord2idx.load_index(index_name, mmap_mode=mmap_mode)
+    except FileNotFoundError:
+        raise OSError(f"Could not find index path for TFRecord {tfrecord}")
+    return path_to_name(tfrecord), index
+
+
+def _cache_index(tfrecord: str) -> None:
+    """Ensures the binary copy of a TFRecord index is up to date.
+
+    Defined at the module level so that it can be used with a
+    multiprocessing pool.
+    """
+    _load_index(tfrecord)
+
+
+def _stat_key(path: str) -> Tuple[int, int, int]:
+    """Returns the modification time, size and inode of a file or folder.
+
+    Used as part of a cache key, so that cached results are refreshed when
+    the path changes on disk. Size and inode are included, as the
+    modification time alone may not change on filesystems with coarse
+    timestamps (e.g. NFS).
+    """
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+@lru_cache(maxsize=256)
+def _read_manifest(
+    path: str,
+    stat_key: Tuple[int, int, int]
+) -> Mapping[str, Mapping[str, int]]:
+    """Reads a manifest.json, caching the parsed result.
+
+    The file's stat (see _stat_key) is part of the cache key, so a
+    manifest is re-read whenever it changes on disk. The result is shared
+    between callers, so it is returned as a read-only mapping of read-only
+    per-tfrecord records.
+    """
+    return MappingProxyType({
+        tfr: MappingProxyType(counts)
+        for tfr, counts in sf.util.load_json(path).items()
+    })
+
+
+@lru_cache(maxsize=256)
+def _list_tfrecords(
+    folder: str,
+    stat_key: Tuple[int, int, int]
+) -> Tuple[str, ...]:
+    """Lists the tfrecords in a folder, caching the result.
+
+    The folder's stat (see _stat_key) is part of the cache key, so the
+    listing is refreshed whenever tfrecords are added or removed. Hidden
+    files are skipped, as with glob.
+    """
+    with os.scandir(folder) as it:
+        return tuple(
+            entry.path for entry in it
+            if entry.name.endswith('.tfrecords')
+            and not entry.name.startswith('.')
+        )
+
+
+def _clear_manifest_caches() -> None:
+    """Clears cached manifests and tfrecord listings.
+
+    Called whenever manifests are written.
+    """
+    _read_manifest.cache_clear()
+    _list_tfrecords.cache_clear()
+
+
+def _read_annotations_csv(path: str, na_filter: bool = True) -> pd.DataFrame:
+    """Reads an annotations CSV, with all values loaded as strings.
+
+    Uses the multithreaded PyArrow CSV parser if available, falling back to
+    the default pandas parser.
+
+    Args:
+        path (str): Path to annotations CSV.
+        na_filter (bool): Read empty and NA-like values ("NA", "null", etc.)
+            as NaN. If False, all values are kept exactly as written, with
+            empty cells as ''. Defaults to True.
+    """
+    if na_filter:
+        pd_kwargs = {}  # type: Dict[str, Any]
+    else:
+        pd_kwargs = dict(keep_default_na=False, na_filter=False)
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+    except ImportError:
+        return pd.read_csv(path, dtype=str, **pd_kwargs)
+    with open(path, newline='') as f:
+        header = next(csv.reader(f), [])
+    # Column types can only be set for unique column names. pandas'
+    # PyArrow engine is not used, as it infers column types before
+    # converting them to strings, changing values such as '007'.
+    if not header or len(set(header)) != len(header):
+        return pd.read_csv(path, dtype=str, **pd_kwargs)
+    convert_options = pa_csv.ConvertOptions(
+        column_types={col: pa.string() for col in header},
+        null_values=(_ANNOTATION_NA_VALUES if na_filter else []),
+        strings_can_be_null=na_filter
+    )
+    try:
+        table = pa_csv.read_csv(path, convert_options=convert_options)
+    except pa.ArrowInvalid:
+        # Unable to parse this file (e.g. rows of varying length)
+        return pd.read_csv(path, dtype=str, **pd_kwargs)
+    return table.to_pandas()
+
+
+def _copy_file(src: str, dst: str) -> None:
+    """Copies a file, using in-kernel copy_file_range() where supported.
+
+    Falls back to :func:`shutil.copy` on platforms without
+    ``os.copy_file_range`` or if the filesystem does not support it.
+    """
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    n = os.copy_file_range(
+                        fsrc.fileno(), fdst.fileno(), remaining
+                    )
+                    if n == 0:
+                        break
+                    remaining -= n
+            if remaining == 0:
+                shutil.copymode(src, dst)
+                return
+        except OSError as e:
+            # Re-raise errors unrelated to copy_file_range support,
+            # such as a full buffer.
+            if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL,
+                               errno.EOPNOTSUPP, errno.EPERM):
+                raise
+    shutil.copy(src, dst)
+
+
 def _fill_queue(
     slide_list: Sequence[str],
     q: Queue,
     q_size: int,
-    buffer: Optional[str] = None
+    buffer: Optional[str] = None,
+    slots: Optional[threading.Semaphore] = None,
+    num_copiers: int = _NUM_BUFFER_COPIERS,
+    num_workers: int = 1
 ) -> None:
-    '''Fills a queue with slide paths, using an optional buffer.'''
-    for path in slide_list:
+    '''Fills a queue with slide paths, using an optional buffer.
+
+    When a buffer is used, slides are copied into the buffer by a pool of
+    ``num_copiers`` threads. Each copier acquires a slot from ``slots``
+    (a semaphore initialized to ``q_size``) before copying a slide. The
+    consumer releases the slot once it has extracted the buffered slide and
+    removed it from the buffer, so the buffer never holds more than
+    ``q_size`` slides, and copies of upcoming slides overlap with extraction.
+    Buffered slides may be queued in a different order than given.
+
+    Once all slides are queued, one ``None`` sentinel is queued for each of
+    the ``num_workers`` consumers, so that every consumer exits.
+    '''
+    if buffer and slots is None:
+        raise ValueError("A semaphore of queue slots is required if using "
+                         "a buffer.")
+
+    def copy_to_buffer(path):
+        slots.acquire()  # type: ignore
+        buffered = join(buffer, basename(path))
         warned = False
-        if buffer:
-            while True:
-                if q.qsize() < q_size:
-                    try:
-                        buffered = join(buffer, basename(path))
-                        shutil.copy(path, buffered)
-                        q.put(buffered)
-                        break
-                    except OSError:
-                        if not warned:
-                            slide = _shortname(path_to_name(path))
-                            log.debug(f'OSError for {slide}: buffer full?')
-                            log.debug(f'Queue size: {q.qsize()}')
-                            warned = True
-                        time.sleep(1)
-                else:
-                    time.sleep(1)
-        else:
+        while True:
+            try:
+                _copy_file(path, buffered)
+                q.put(buffered)
+                break
+            except OSError:
+                if not warned:
+                    slide = _shortname(path_to_name(path))
+                    log.debug(f'OSError for {slide}: buffer full?')
+                    log.debug(f'Queue size: {q.qsize()}')
+                    warned = True
+                time.sleep(1)
+
+    if buffer:
+        with DPool(max(1, min(num_copiers, q_size))) as pool:
+            for _ in pool.imap_unordered(copy_to_buffer, slide_list):
+                pass
+    else:
+        for path in slide_list:
             q.put(path)
-    q.put(None)
+    for _ in range(num_workers):
+        q.put(None)
     q.join()
 
 
 def split_patients_preserved_site(
     patients_dict: Dict[str, Dict],
     n: int,
-    balance: str
+    balance: str,
+    rng: Optional[random.Random] = None
 ) -> List[List[str]]:
     """Splits a dictionary of patients into n groups,
     balancing according to key "balance" while preserving site.
@@ -227,6 +622,8 @@ def split_patients_preserved_site(
             dict of outcomes: labels
         n (int): Number of splits to generate.
         balance (str): Annotation header to balance splits across.
+        rng (random.Random, optional): Random number generator used to
+            shuffle patients. Defaults to None (global random state).
 
     Returns:
         List of patient splits
@@ -234,11 +631,7 @@ def split_patients_preserved_site(
     if not sf.util.CPLEX_AVAILABLE:
         raise errors.CPLEXNotFoundError
     patient_list = list(patients_dict.keys())
-    shuffle(patient_list)
-
-    def flatten(arr):
-        '''Flattens an array'''
-        return [y for x in arr for y in x]
+    (rng or random).shuffle(patient_list)
 
     # Get patient outcome labels
     patient_outcome_labels = [
@@ -268,23 +661,26 @@ def split_patients_preserved_site(
     log.info(col.bold(
         "Category\t" + "\t".join([str(cat) for cat in range(n_unique)])
     ))
+    # Tabulate outcomes per fold in a single pass
+    folds = [str(k+1) for k in range(n)]
+    counts = pd.crosstab(df.CV, df.outcome_label).reindex(
+        index=folds, columns=unique_labels, fill_value=0
+    )
     for k in range(n):
-        def num_labels_matching(o):
-            match = df[(df.CV == str(k+1)) & (df.outcome_label == o)]
-            return str(len(match))
-        matching = [num_labels_matching(o) for o in unique_labels]
+        matching = counts.iloc[k].astype(str).tolist()
         log.info(f"K-fold-{k}\t" + "\t".join(matching))
-    splits = [
-        df.loc[df.CV == str(ni+1), "patient"].tolist()
-        for ni in range(n)
-    ]
+    pts_by_fold = {
+        fold: pts.tolist() for fold, pts in df.groupby('CV')['patient']
+    }
+    splits = [pts_by_fold.get(fold, []) for fold in folds]
     return splits
 
 
 def split_patients_balanced(
     patients_dict: Dict[str, Dict],
     n: int,
-    balance: str
+    balance: str,
+    rng: Optional[random.Random] = None
 ) -> List[List[str]]:
     """Splits a dictionary of patients into n groups,
     balancing according to key "balance".
@@ -294,34 +690,33 @@ def split_patients_balanced(
             dict of outcomes: labels
         n (int): Number of splits to generate.
         balance (str): Annotation header to balance splits across.
+        rng (random.Random, optional): Random number generator used to
+            shuffle patients. Defaults to None (global numpy random state).
 
     Returns:
         List of patient splits
     """
-    patient_list = list(patients_dict.keys())
-    shuffle(patient_list)
-
-    def flatten(arr):
-        '''Flattens an array'''
-        return [y for x in arr for y in x]
-
-    # Get patient outcome labels
-    patient_outcome_labels = [
-        patients_dict[p][balance] for p in patient_list
-    ]
-    # Get unique outcomes
-    unique_labels = list(set(patient_outcome_labels))
-    n_unique = len(set(unique_labels))
+    if rng is not None:
+        patient_list = list(patients_dict.keys())
+        rng.shuffle(patient_list)
+        patient_arr = np.array(patient_list, dtype=object)
+    else:
+        patient_arr = np.random.permutation(
+            np.array(list(patients_dict.keys()), dtype=object)
+        )
 
-    # Now, split patient_list according to outcomes
+    # Group patients by outcome label, preserving the shuffled order
+    df = pd.DataFrame({
+        'patient': patient_arr,
+        'label': [patients_dict[p][balance] for p in patient_arr]
+    })
     pt_by_outcome = [
-        [p for p in patient_list if patients_dict[p][balance] == uo]
-        for uo in unique_labels
-    ]
-    # Then, for each sublist, split into n components
-    pt_by_outcome_by_n = [
-        list(sf.util.split_list(sub_l, n)) for sub_l in pt_by_outcome
+        g['patient'].to_numpy(dtype=object)
+        for _, g in df.groupby('label', sort=False)
     ]
+    n_unique = len(pt_by_outcome)
+    # Then, for each outcome, split into n components
+    pt_by_outcome_by_n = [np.array_split(pts, n) for pts in pt_by_outcome]
     # Print splitting as a table
     log.info(col.bold(
         "Category\t" + "\t".join([str(cat) for cat in range(n_unique)])
@@ -331,26 +726,32 @@ def split_patients_balanced(
         log.info(f"K-fold-{k}\t" + "\t".join(matching))
     # Join sublists
     splits = [
-        flatten([
+        np.concatenate([
             item[ni] for item in pt_by_outcome_by_n
-        ]) for ni in range(n)
+        ]).tolist() for ni in range(n)
     ]
     return splits
 
 
-def split_patients(patients_dict: Dict[str, Dict], n: int) -> List[List[str]]:
+def split_patients(
+    patients_dict: Dict[str, Dict],
+    n: int,
+    rng: Optional[random.Random] = None
+) -> List[List[str]]:
     """Splits a dictionary of patients into n groups."
 
     Args:
         patients_dict (dict): Nested ditionary mapping patient names to
             dict of outcomes: labels
         n (int): Number of splits to generate.
+        rng (random.Random, optional): Random number generator used to
+            shuffle patients. Defaults to None (global random state).
 
     Returns:
         List of patient splits
     """
     patient_list = list(patients_dict.keys())
-    shuffle(patient_list)
+    (rng or random).shuffle(patient_list)
     return list(sf.util.split_list(patient_list, n))
 
 
@@ -384,7 +785,7 @@ def split_patients_list(
              "split_patients_balanced(), or split_patients_preserved_site().")
     if not balance:
         patient_list = list(patients_dict.keys())
-        shuffle(patient_list)
+        random.shuffle(patient_list)
         return list(sf.util.split_list(patient_list, n))
     elif preserved_site:
         return split_patients_preserved_site(patients_dict, n, balance)
@@ -448,6 +849,13 @@ class Dataset:
         self._config = config
         self._annotations = None  # type: Optional[pd.DataFrame]
         self.annotations_file = None  # type: Optional[str]
+        self._tfrecords_cache = {}  # type: Dict[Optional[str], List[str]]
+        self._manifest_cache = {}  # type: Dict[Tuple[str, bool], Dict]
+        self._manifest_soa = None  # type: Optional[Tuple[np.ndarray, ...]]
+        self._filtered_ann_cache = None  # type: Optional[pd.DataFrame]
+        self._tfr_names_cache = None  # type: Optional[Dict[str, str]]
+        self._slides_cache = None  # type: Optional[List[str]]
+        self._idx_cache = None  # type: Optional[Dict[str, np.ndarray]]
         loaded_config = sf.util.load_json(config)
         sources = sources if isinstance(sources, list) else [sources]
         try:
@@ -458,15 +866,15 @@ class Dataset:
         except KeyError:
             sources_list = ', '.join(sources)
             raise errors.SourceNotFoundError(sources_list, config)
-        if (tile_px is not None) and (tile_um is not None):
-            if isinstance(tile_um, str):
-                label = f"{tile_px}px_{tile_um.lower()}"
-            else:
-                label = f"{tile_px}px_{tile_um}um"
+        # Name of the tile size subfolder in each source (e.g. "299px_302um")
+        if (tile_px is None) or (tile_um is None):
+            self._label = None  # type: Optional[str]
+        elif isinstance(tile_um, str):
+            self._label = f"{tile_px}px_{tile_um}"
         else:
-            label = None
-        for source in self.sources:
-            self.sources[source]['label'] = label
+            self._label = f"{tile_px}px_{tile_um}um"
+        for src_conf in self.sources.values():
+            src_conf['label'] = self._label
         if annotations is not None:
             self.load_annotations(annotations)
 
@@ -479,6 +887,10 @@ class Dataset:
             self.tile_um
         )
 
+    def __copy__(self) -> "Dataset":
+        """Returns a shallow copy; see :meth:`Dataset._clone`."""
+        return self._clone()
+
     @property
     def annotations(self) -> Optional[pd.DataFrame]:
         return self._annotations
@@ -488,15 +900,8 @@ class Dataset:
         """Returns the total number of tiles in the tfrecords in this dataset,
         after filtering/clipping.
         """
-        tfrecords = self.tfrecords()
-        m = self.manifest()
-        if not all([tfr in m for tfr in tfrecords]):
-            self.update_manifest()
-        n_tiles = [
-            m[tfr]['total'] if 'clipped' not in m[tfr] else m[tfr]['clipped']
-            for tfr in tfrecords
-        ]
-        return sum(n_tiles)
+        _, _, clipped = self._manifest_arrays()
+        return int(clipped.sum())
 
     @property
     def filters(self) -> Dict:
@@ -515,8 +920,19 @@ class Dataset:
 
     @property
     def filtered_annotations(self) -> pd.DataFrame:
+        if self.annotations is None:
+            return None
+        if self._filtered_ann_cache is None:
+            self._filtered_ann_cache = self._filter_annotations()
+        # Shallow copy, so that added columns do not leak into the cache
+        return self._filtered_ann_cache.copy(deep=False)
+
+    def _filter_annotations(self) -> pd.DataFrame:
+        """Applies filters and filter_blank to the loaded annotations."""
         if self.annotations is not None:
             f_ann = self.annotations
+            # Accumulate a single boolean mask, then slice once
+            mask = pd.Series(True, index=f_ann.index)
 
             # Only return slides with annotation values specified in "filters"
             if self.filters:
@@ -526,7 +942,7 @@ class Dataset:
                             f"Filter header {filter_key} not in annotations."
                         )
                     filter_vals = sf.util.as_list(self.filters[filter_key])
-                    f_ann = f_ann.loc[f_ann[filter_key].isin(filter_vals)]
+                    mask &= f_ann[filter_key].isin(filter_vals)
 
             # Filter out slides that are blank in a given annotation
             # column ("filter_blank")
@@ -536,10 +952,10 @@ class Dataset:
                         raise errors.DatasetFilterError(
                             f"Filter blank header {fb} not in annotations."
                         )
-                    f_ann = f_ann.loc[f_ann[fb].notna()]
-                    f_ann = f_ann.loc[~f_ann[fb].isin(sf.util.EMPTY_ANNOTATIONS)]
+                    mask &= f_ann[fb].notna()
+                    mask &= ~f_ann[fb].isin(_EMPTY_ANNOTATIONS)
 
-            return f_ann
+            return f_ann.loc[mask]
         else:
             return None
 
@@ -553,6 +969,99 @@ class Dataset:
         """
         return self.verify_img_format()
 
+    def _manifest_arrays(
+        self
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the filtered manifest in columnar form.
+
+        Returns:
+            A tuple of three aligned arrays: tfrecord paths, total tiles,
+            and clipped tiles, with one entry per filtered tfrecord.
+        """
+        if self._manifest_soa is None:
+            tfrecords = self.tfrecords()
+            m = self.manifest()
+            if not all([tfr in m for tfr in tfrecords]):
+                self.update_manifest()
+                m = self.manifest()
+            n = len(tfrecords)
+            paths = np.array(tfrecords, dtype=object)
+            total = np.fromiter(
+                (m[tfr]['total'] for tfr in tfrecords), np.int64, count=n
+            )
+            clipped = np.fromiter(
+                (m[tfr]['clipped'] for tfr in tfrecords), np.int64, count=n
+            )
+            self._manifest_soa = (paths, total, clipped)
+        return self._manifest_soa
+
+    def _tfrecord_names(self) -> Dict[str, str]:
+        """Returns a dict mapping each filtered tfrecord to its slide name."""
+        if self._tfr_names_cache is None:
+            self._tfr_names_cache = {
+                tfr: path_to_name(tfr) for tfr in self.tfrecords()
+            }
+        return self._tfr_names_cache
+
+    def _cached_indices(self) -> Dict[str, np.ndarray]:
+        """Returns in-memory indices for the filtered tfrecords."""
+        if self._idx_cache is None:
+            self._idx_cache = self.load_indices()
+        return self._idx_cache
+
+    def _slide_categories(
+        self,
+        headers: Union[str, List[str]]
+    ) -> Dict[str, str]:
+        """Returns a dict mapping slides to their combined category.
+
+        The category of a slide is its annotation values for each of the
+        given headers, joined with '-'.
+        """
+        headers = sf.util.as_list(headers)
+        ann = self.filtered_annotations
+        for header in headers:
+            if header not in ann.columns:
+                raise errors.AnnotationsError(f"Missing column {header}.")
+        categories = ann[headers[0]].astype(str)
+        for header in headers[1:]:
+            categories = categories + '-' + ann[header].astype(str)
+        return dict(zip(ann['slide'], categories))
+
+    def _clone(self) -> "Dataset":
+        """Returns a shallow copy of this dataset.
+
+        Annotations and source configuration are shared with the copy, as
+        they are only ever replaced, never modified in place. Filters,
+        clipping, and balancing weights are copied so they can be changed
+        independently. Cached lookups are carried over, and are cleared
+        on the copy as soon as its filters or clipping change.
+        """
+        new = Dataset.__new__(Dataset)
+        new.__dict__.update(self.__dict__)
+        new._filters = dict(self._filters)
+        new._filter_blank = list(self._filter_blank)
+        new._clip = dict(self._clip)
+        if self.prob_weights is not None:
+            new.prob_weights = dict(self.prob_weights)
+        new._tfrecords_cache = dict(self._tfrecords_cache)
+        new._manifest_cache = dict(self._manifest_cache)
+        return new
+
+    def _clear_cache(self) -> None:
+        """Clears cached tfrecords, manifest, and annotation lookups.
+
+        Must be called whenever filters, clipping, annotations, or the
+        tfrecords on disk change.
+        """
+        self._tfrecords_cache = {}
+        self._manifest_cache = {}
+        self._manifest_soa = None
+        self._filtered_ann_cache = None
+        self._tfr_names_cache = None
+        self._slides_cache = None
+        self._idx_cache = None
+
     def _assert_size_matches_hp(self, hp: Union[Dict, ModelParams]) -> None:
         """Checks if dataset tile size (px/um) matches the given parameters."""
         if isinstance(hp, dict):
@@ -586,7 +1095,7 @@ class Dataset:
                     f'Unable to find annotations file {annotations}'
                 )
             try:
-                ann_df = pd.read_csv(annotations, dtype=str)
+                ann_df = _read_annotations_csv(annotations)
                 ann_df.fillna('', inplace=True)
                 self._annotations = ann_df
                 self.annotations_file = annotations
@@ -602,6 +1111,7 @@ class Dataset:
 
         # Check annotations
         assert self.annotations is not None
+        self._clear_cache()
         if len(self.annotations.columns) == 1:
             raise errors.AnnotationsError(
                 "Only one annotations column detected (is it in CSV format?)"
@@ -679,16 +1189,10 @@ class Dataset:
         Returns:
             balanced :class:`slideflow.dataset.Dataset` object.
         """
-        ret = copy.deepcopy(self)
-        manifest = ret.manifest()
+        ret = self._clone()
         tfrecords = ret.tfrecords()
-        slides = [path_to_name(tfr) for tfr in tfrecords]
-        totals = {
-            tfr: (manifest[tfr]['total']
-                  if 'clipped' not in manifest[tfr]
-                  else manifest[tfr]['clipped'])
-            for tfr in tfrecords
-        }
+        tfr_names = ret._tfrecord_names()
+        slides = [tfr_names[tfr] for tfr in tfrecords]
         if not tfrecords:
             raise errors.DatasetBalanceError(
                 "Unable to balance; no tfrecords found."
@@ -697,25 +1201,22 @@ class Dataset:
         if strategy == 'none' or strategy is None:
             return self
         if strategy == 'tile':
-            ret.prob_weights = {
-                tfr: totals[tfr] / sum(totals.values()) for tfr in tfrecords
-            }
+            paths, _, clipped = ret._manifest_arrays()
+            weights = clipped / clipped.sum()
+            ret.prob_weights = dict(zip(paths.tolist(), weights.tolist()))
         if strategy == 'slide':
             ret.prob_weights = {tfr: 1/len(tfrecords) for tfr in tfrecords}
         if strategy == 'patient':
             pts = ret.patients()  # Maps tfrecords to patients
-            r_pts = {}  # Maps patients to list of tfrecords
-            for slide in pts:
-                if slide not in slides:
-                    continue
-                if pts[slide] not in r_pts:
-                    r_pts[pts[slide]] = [slide]
-                else:
-                    r_pts[pts[slide]] += [slide]
-            ret.prob_weights = {
-                tfr: 1/(len(r_pts) * len(r_pts[pts[path_to_name(tfr)]]))
-                for tfr in tfrecords
-            }
+            df = pd.DataFrame({
+                'tfr': tfrecords,
+                'slide': slides,
+                'patient': [pts[s] for s in slides]
+            })
+            # Number of slides for each tfrecord's patient
+            slides_per_pt = df.groupby('patient')['slide'].transform('nunique')
+            prob = 1 / (df['patient'].nunique() * slides_per_pt)
+            ret.prob_weights = dict(zip(df['tfr'].tolist(), prob.tolist()))
         if strategy == 'category':
             if headers is None:
                 raise ValueError('Category balancing requires headers.')
@@ -728,34 +1229,15 @@ class Dataset:
                     "To force balancing with these outcomes, pass "
                     "`force=True` to Dataset.balance()"
                 )
-            labels, _ = ret.labels(headers, use_float=False)
-            cats = {}  # type: Dict[str, Dict]
-            cat_prob = {}
-            tfr_cats = {}  # type: Dict[str, str]
-            for tfrecord in tfrecords:
-                slide = path_to_name(tfrecord)
-                balance_cat = sf.util.as_list(labels[slide])
-                balance_cat_str = '-'.join(map(str, balance_cat))
-                tfr_cats[tfrecord] = balance_cat_str
-                tiles = totals[tfrecord]
-                if balance_cat_str not in cats:
-                    cats.update({balance_cat_str: {
-                        'num_slides': 1,
-                        'num_tiles': tiles
-                    }})
-                else:
-                    cats[balance_cat_str]['num_slides'] += 1
-                    cats[balance_cat_str]['num_tiles'] += tiles
-            for category in cats:
-                min_cat_slides = min([
-                    cats[i]['num_slides'] for i in cats
-                ])
-                slides_in_cat = cats[category]['num_slides']
-                cat_prob[category] = min_cat_slides / slides_in_cat
-            total_prob = sum([cat_prob[tfr_cats[tfr]] for tfr in tfrecords])
-            ret.prob_weights = {
-                tfr: cat_prob[tfr_cats[tfr]]/total_prob for tfr in tfrecords
-            }
+            slide_cat = ret._slide_categories(headers)
+            df = pd.DataFrame({'tfr': tfrecords, 'slide': slides})
+            df['category'] = df['slide'].map(slide_cat)
+            # Sample each category with equal probability, by weighting
+            # each tfrecord inversely to the number of slides in its category
+            slides_per_cat = df.groupby('category')['tfr'].transform('size')
+            cat_prob = slides_per_cat.min() / slides_per_cat
+            cat_prob /= cat_prob.sum()
+            ret.prob_weights = dict(zip(df['tfr'].tolist(), cat_prob.tolist()))
         return ret
 
     def build_index(self, force: bool = True) -> None:
@@ -768,22 +1250,29 @@ class Dataset:
             None
 
         """
-        def create_index(filename):
-            nonlocal force
-            index_name = join(
-                dirname(filename),
-                path_to_name(filename)+'.index'
-            )
-            if not exists(index_name) or force:
-                tfrecord2idx.create_index(filename, index_name)
-        pool = DPool(16)
-        for _ in tqdm(pool.imap(create_index, self.tfrecords()),
-                      desc='Creating index files...',
-                      ncols=80,
-                      total=len(self.tfrecords()),
-                      leave=False):
-            pass
-        pool.close()
+        tfrecords = self.tfrecords()
+        if not force:
+            tfrecords = [
+                tfr for tfr in tfrecords
+                if not exists(join(dirname(tfr), path_to_name(tfr)+'.index'))
+            ]
+        if not tfrecords:
+            return
+        self._idx_cache = None
+        # Indexing is CPU-bound Python, so use processes rather than threads
+        num_workers = min(os.cpu_count() or 8, len(tfrecords))
+        chunksize = max(1, len(tfrecords) // (num_workers * 4))
+        with multiprocessing.Pool(num_workers) as pool:
+            for _ in tqdm(pool.imap_unordered(_create_index,
+                                              tfrecords,
+                                              chunksize=chunksize),
+                          desc='Creating index files...',
+                          ncols=80,
+                          total=len(tfrecords),
+                          leave=False):
+                pass
+            pool.close()
+            pool.join()
 
     def clear_filters(self) -> "Dataset":
         """Returns a dataset with all filters cleared.
@@ -792,10 +1281,11 @@ class Dataset:
             :class:`slideflow.dataset.Dataset` object.
         """
 
-        ret = copy.deepcopy(self)
+        ret = self._clone()
         ret._filters = {}
         ret._filter_blank = []
         ret._min_tiles = 0
+        ret._clear_cache()
         return ret
 
     def clip(
@@ -831,78 +1321,59 @@ class Dataset:
         if strategy is None and headers is None and not max_tiles:
             return self
 
-        ret = copy.deepcopy(self)
-        manifest = ret.manifest()
-        tfrecords = ret.tfrecords()
-        slides = [path_to_name(tfr) for tfr in tfrecords]
-        totals = {tfr: manifest[tfr]['total'] for tfr in tfrecords}
-
-        if not tfrecords:
+        ret = self._clone()
+        if not ret.tfrecords():
             raise errors.DatasetClipError("Unable to clip; no tfrecords found.")
+        # Tfrecord paths and total tiles, aligned, from a single pass
+        # over the manifest
+        paths, totals_arr, _ = ret._manifest_arrays()
+        tfr_list = paths.tolist()
+        tfr_names = ret._tfrecord_names()
+        slides = [tfr_names[tfr] for tfr in tfr_list]
+
         if strategy == 'slide':
             if max_tiles:
-                clip = min(min(totals.values()), max_tiles)
+                clip = min(int(totals_arr.min()), max_tiles)
             else:
-                clip = min(totals.values())
-            ret._clip = {
-                tfr: (clip if totals[tfr] > clip else totals[tfr])
-                for tfr in manifest
-            }
+                clip = int(totals_arr.min())
+            clipped = np.minimum(totals_arr, clip)
         elif strategy == 'patient':
             patients = ret.patients()  # Maps slide name to patient
-            rev_patients = {}  # Will map patients to list of slide names
-            slide_totals = {path_to_name(tfr): t for tfr, t in totals.items()}
-            for slide in patients:
-                if slide not in slides:
-                    continue
-                if patients[slide] not in rev_patients:
-                    rev_patients[patients[slide]] = [slide]
-                else:
-                    rev_patients[patients[slide]] += [slide]
-            tiles_per_patient = {
-                pt: sum([slide_totals[slide] for slide in slide_list])
-                for pt, slide_list in rev_patients.items()
-            }
+            slide_totals = dict(zip(slides, totals_arr.tolist()))
+            # Maps patients to total tiles across their slides
+            tiles_per_patient = defaultdict(int)  # type: Dict[str, int]
+            for slide, pt in patients.items():
+                if slide in slide_totals:
+                    tiles_per_patient[pt] += slide_totals[slide]
             if max_tiles:
                 clip = min(min(tiles_per_patient.values()), max_tiles)
             else:
                 clip = min(tiles_per_patient.values())
-            ret._clip = {
-                tfr: (clip
-                      if slide_totals[path_to_name(tfr)] > clip
-                      else totals[tfr])
-                for tfr in manifest
-            }
+            clipped = np.minimum(totals_arr, clip)
         elif strategy == 'category':
             if headers is None:
                 raise ValueError("Category clipping requires arg `headers`")
-            labels, _ = ret.labels(headers, use_float=False)
-            categories = {}
-            cat_fraction = {}
-            tfr_cats = {}
-            for tfrecord in tfrecords:
-                slide = path_to_name(tfrecord)
-                balance_category = sf.util.as_list(labels[slide])
-                balance_cat_str = '-'.join(map(str, balance_category))
-                tfr_cats[tfrecord] = balance_cat_str
-                tiles = totals[tfrecord]
-                if balance_cat_str not in categories:
-                    categories[balance_cat_str] = tiles
-                else:
-                    categories[balance_cat_str] += tiles
-
-            for category in categories:
-                min_cat_count = min([categories[i] for i in categories])
-                cat_fraction[category] = min_cat_count / categories[category]
-            ret._clip = {
-                tfr: int(totals[tfr] * cat_fraction[tfr_cats[tfr]])
-                for tfr in manifest
+            slide_cat = ret._slide_categories(headers)
+            tfr_cats = [slide_cat[slide] for slide in slides]
+            categories = defaultdict(int)  # type: Dict[str, int]
+            for cat, total in zip(tfr_cats, totals_arr.tolist()):
+                categories[cat] += total
+
+            min_cat_count = min(categories.values())
+            cat_fraction = {
+                category: min_cat_count / count
+                for category, count in categories.items()
             }
+            frac_arr = np.array([cat_fraction[cat] for cat in tfr_cats])
+            clipped = (totals_arr * frac_arr).astype(np.int64)
         elif max_tiles:
-            ret._clip = {
-                tfr: (max_tiles if totals[tfr] > max_tiles else totals[tfr])
-                for tfr in manifest
-            }
+            clipped = np.minimum(totals_arr, max_tiles)
+        else:
+            clipped = None
+        if clipped is not None:
+            ret._clip = dict(zip(tfr_list, clipped.tolist()))
+        # Clipped totals are reported by the manifest, so reset the cache
+        ret._clear_cache()
         return ret
 
     def extract_tiles(
@@ -921,6 +1392,7 @@ class Dataset:
         q_size: int = 4,
         qc: Optional[str] = None,
         report: bool = True,
+        estimate_tiles: bool = True,
         **kwargs: Any
     ) -> Optional[ExtractionReport]:
         """Extract tiles from a group of slides, saving extracted tiles to
@@ -971,6 +1443,11 @@ class Dataset:
                 Increases tile extraction time. Defaults to None.
             report (bool, optional): Save a PDF report of tile extraction.
                 Defaults to True.
+            estimate_tiles (bool, optional): Open each slide before
+                extraction to estimate the total number of tiles, used for
+                the progress bar. Estimates are cached in
+                estimated_tiles.json, alongside the dataset configuration.
+                Disable to skip this step on large datasets. Defaults to True.
 
         Keyword Args:
             normalizer (str, optional): Normalization strategy.
@@ -1038,6 +1515,11 @@ class Dataset:
         kwargs = {k: v for k, v in kwargs.items() if k[:3] != 'qc_'}
         sf.slide.log_extraction_params(**kwargs)
 
+        # Multiprocessing manager and tile pool, created on first use and
+        # shared across sources
+        manager = None
+        tile_pool = None
+
         for source in sources:
             log.info(f'Working on dataset source {col.bold(source)}...')
             roi_dir = self.sources[source]['roi']
@@ -1067,18 +1549,20 @@ class Dataset:
 
             # Check for interrupted or already-extracted tfrecords
             if skip_extracted and save_tfrecords:
-                done = [
+                done = {
                     path_to_name(tfr) for tfr in self.tfrecords(source=source)
-                ]
+                }
                 _dir = tfrecord_dir if tfrecord_dir else tiles_dir
-                unfinished = glob(join((_dir), '*.unfinished'))
-                interrupted = [path_to_name(marker) for marker in unfinished]
+                with os.scandir(_dir) as entries:
+                    interrupted = [
+                        path_to_name(e.name) for e in entries
+                        if e.name.endswith('.unfinished')
+                    ]
                 if len(interrupted):
                     log.info(f'Re-extracting {len(interrupted)} interrupted')
                     for interrupted_slide in interrupted:
                         log.info(interrupted_slide)
-                        if interrupted_slide in done:
-                            del done[done.index(interrupted_slide)]
+                        done.discard(interrupted_slide)
 
                 slide_list = [
                     s for s in slide_list if path_to_name(s) not in done
@@ -1088,12 +1572,41 @@ class Dataset:
             _tail = f"(tile_px={self.tile_px}, tile_um={self.tile_um})"
             log.info(f'Extracting tiles from {len(slide_list)} slides {_tail}')
 
-            # Verify slides and estimate total number of tiles
-            log.info('Verifying slides...')
-            total_tiles = 0
-            for slide_path in tqdm(slide_list,
-                                   leave=False,
-                                   desc="Verifying slides..."):
+            # Tile estimates are only used for progress reporting. They are
+            # cached alongside the dataset configuration, keyed by slide and
+            # ROI file size and modification time, so unchanged slides are
+            # not re-opened on subsequent runs.
+            if estimate_tiles:
+                est_cache_path = join(
+                    dirname(abspath(self._config)), _TILE_ESTIMATES_CACHE
+                )
+            else:
+                est_cache_path = None
+            if est_cache_path and exists(est_cache_path):
+                est_cache = sf.util.load_json(est_cache_path)
+            else:
+                est_cache = {}
+            est_params = [
+                self.tile_px, self.tile_um, stride_div, roi_method, bool(tma)
+            ]
+            est_updated = []  # type: List[str]
+
+            def estimate_slide_tiles(slide_path):
+                stat = os.stat(slide_path)
+                roi_path = None
+                if roi_dir:
+                    roi_path = join(roi_dir, path_to_name(slide_path) + '.csv')
+                if roi_path and exists(roi_path):
+                    roi_stat = os.stat(roi_path)
+                    roi_key = [roi_stat.st_mtime_ns, roi_stat.st_size]
+                else:
+                    roi_key = None
+                cache_key = [
+                    stat.st_mtime_ns, stat.st_size, roi_key, est_params
+                ]
+                cached = est_cache.get(slide_path)
+                if cached is not None and cached[:-1] == cache_key:
+                    return cached[-1]
                 try:
                     if tma:
                         slide = sf.slide.TMA(
@@ -1112,29 +1625,54 @@ class Dataset:
                             roi_method=roi_method,
                             silent=True
                         )
-                except errors.SlideError as e:
+                except errors.SlideError:
                     log.debug(f"Skipping {slide_path}")
-                    continue
+                    return 0
                 else:
                     est = slide.estimated_num_tiles  # type: ignore
                     log.debug(f"Estimated tiles for slide {slide.name}: {est}")
-                    total_tiles += est
-                    del slide
-            log.info(f'Total estimated tiles to extract: {total_tiles}')
+                    est_cache[slide_path] = cache_key + [est]
+                    est_updated.append(slide_path)
+                    return est
+
+            # Verify slides and estimate total number of tiles. Slide headers
+            # are read in parallel threads, as this is dominated by I/O.
+            total_tiles = 0
+            if estimate_tiles and len(slide_list):
+                log.info('Verifying slides...')
+                with DPool(min(32, len(slide_list))) as pool:
+                    for est in tqdm(pool.imap_unordered(estimate_slide_tiles,
+                                                        slide_list),
+                                    total=len(slide_list),
+                                    leave=False,
+                                    desc="Verifying slides..."):
+                        total_tiles += est
+                log.info(f'Total estimated tiles to extract: {total_tiles}')
+            if est_cache_path and est_updated:
+                sf.util.write_json(est_cache, est_cache_path)
 
             # Use multithreading if specified, extracting tiles
             # from all slides in the filtered list
             if len(slide_list):
                 q = Queue()  # type: Queue
+                slots = threading.Semaphore(q_size)
                 task_finished = False
-                manager = multiprocessing.Manager()
                 ctx = multiprocessing.get_context('fork')
-                reports = manager.dict()  # type: dict
-                counter = manager.Value('i', 0)
-                counter_lock = manager.Lock()
+                if manager is None:
+                    manager = multiprocessing.Manager()
+                    reports = manager.dict()  # type: dict
+                    # The tile counter is updated for every extracted tile,
+                    # so it is kept in shared memory rather than proxied
+                    # through the manager. It is inherited by the forked
+                    # extraction processes.
+                    counter = ctx.Value('q', 0)
+                    counter_lock = counter.get_lock()
+                else:
+                    reports.clear()
+                    counter.value = 0
 
                 # If only one worker, use a single shared multiprocessing pool
-                if num_workers == 1:
+                if num_workers == 1 and tile_pool is None:
                     # Detect CPU cores if num_threads not specified
                     if 'num_threads' not in kwargs:
                         num_threads = os.cpu_count()
@@ -1143,7 +1681,8 @@ class Dataset:
                     else:
                         num_threads = kwargs['num_threads']
                     log.info(f'Extracting tiles with {num_threads} threads')
-                    kwargs['pool'] = multiprocessing.Pool(num_threads)
+                    tile_pool = multiprocessing.Pool(num_threads)
+                    kwargs['pool'] = tile_pool
 
                 # Set up the multiprocessing progress bar
                 if total_tiles:
@@ -1182,24 +1721,49 @@ class Dataset:
                     'wsi_kwargs': wsi_kwargs
                 }
 
-                # Worker to grab slide path from queue and start extraction
+                # Worker to grab slide path from queue and start extraction.
+                # If using multiple workers, each worker thread hands slides
+                # to its own long-lived extraction process, which is
+                # recycled after a fixed number of slides.
                 def worker():
+                    process, conn, n_extracted = None, None, 0
                     while not task_finished:
                         path = q.get()
                         if path is None:
                             q.task_done()
                             break
                         if num_workers > 1:
-                            process = ctx.Process(target=_tile_extractor,
-                                                  args=(path,),
-                                                  kwargs=extraction_kwargs)
-                            process.start()
-                            process.join()
+                            if process is None:
+                                conn, child_conn = ctx.Pipe()
+                                process = ctx.Process(
+                                    target=_extraction_process,
+                                    args=(child_conn, extraction_kwargs)
+                                )
+                                process.start()
+                                # Close the parent's copy of the child end,
+                                # so recv() raises EOFError if the child dies
+                                child_conn.close()
+                                n_extracted = 0
+                            conn.send(path)
+                            try:
+                                conn.recv()
+                                n_extracted += 1
+                            except EOFError:
+                                log.error(f"Extraction process for {path} "
+                                          "exited unexpectedly.")
+                                n_extracted = _MAX_SLIDES_PER_PROCESS
+                            if n_extracted >= _MAX_SLIDES_PER_PROCESS:
+                                process.join()
+                                process = None
                         else:
                             _tile_extractor(path, **extraction_kwargs)
                         if buffer:
                             os.remove(path)
+                            slots.release()
                         q.task_done()
+                    if process is not None:
+                        conn.send(None)
+                        process.join()
 
                 # Start the worker threads
                 threads = [
@@ -1209,7 +1773,14 @@ class Dataset:
                     thread.start()
 
                 # Put each slide path into queue
-                _fill_queue(slide_list, q, q_size, buffer=buffer)
+                _fill_queue(
+                    slide_list,
+                    q,
+                    q_size,
+                    buffer=buffer,
+                    slots=slots,
+                    num_workers=num_workers
+                )
                 task_finished = True
                 for thread in threads:
                     thread.join()
@@ -1250,6 +1821,11 @@ class Dataset:
                     with open(warn_path, 'w') as warn_f:
                         warn_f.write(pdf_report.warn_txt)
 
+        if tile_pool is not None:
+            tile_pool.close()
+        if manager is not None:
+            manager.shutdown()
+
         # Update manifest & rebuild indices
         self.update_manifest(force_update=True)
         self.build_index(True)
@@ -1299,7 +1875,7 @@ class Dataset:
         for kwarg in kwargs:
             if kwarg not in ('filters', 'filter_blank', 'min_tiles'):
                 raise ValueError(f'Unknown filtering argument {kwarg}')
-        ret = copy.deepcopy(self)
+        ret = self._clone()
         if 'filters' in kwargs and kwargs['filters'] is not None:
             if not isinstance(kwargs['filters'], dict):
                 raise TypeError("'filters' must be a dict.")
@@ -1312,6 +1888,7 @@ class Dataset:
             if not isinstance(kwargs['min_tiles'], int):
                 raise TypeError("'min_tiles' must be an int.")
             ret._min_tiles = kwargs['min_tiles']
+        ret._clear_cache()
         return ret
 
     def harmonize_labels(
@@ -1335,13 +1912,10 @@ class Dataset:
         if not isinstance(header, str):
             raise ValueError('Harmonized labels require a single header.')
 
-        _, my_unique = self.labels(header, use_float=False)
-        other_uniques = [
-            np.array(dts.labels(header, use_float=False)[1]) for dts in args
-        ]
-        other_uniques = other_uniques + [np.array(my_unique)]
-        uniques_list = np.concatenate(other_uniques).to_list()
-        all_unique = sorted(list(set(uniques_list)))
+        all_unique = np.unique(np.concatenate([
+            np.asarray(dts.labels(header, use_float=False)[1])
+            for dts in (self, *args)
+        ])).tolist()
         labels_to_int = dict(zip(all_unique, range(len(all_unique))))
         return labels_to_int
 
@@ -1356,7 +1930,7 @@ class Dataset:
         """
         filtered_labels = self.filtered_annotations[header]
         try:
-            filtered_labels = [float(o) for o in filtered_labels]
+            filtered_labels.astype(float)
             return True
         except ValueError:
             return False
@@ -1402,6 +1976,7 @@ class Dataset:
                 "Cannot generate labels: dataset is empty after filtering."
             )
         results = {}  # type: Dict
+        label_columns = []  # type: List[Tuple[Any, bool]]
         headers = sf.util.as_list(headers)
         unique_labels = {}
         filtered_pts = self.filtered_annotations.patient
@@ -1447,10 +2022,15 @@ class Dataset:
                 filtered_labels = filtered_labels.astype(float)
             else:
                 log.debug(f'Interpreting column "{header}" as continuous')
-                unique_labels_for_this_header = list(set(filtered_labels))
-                unique_labels_for_this_header.sort()
+                # Categories are sorted, and codes index into them
+                cat_labels = pd.Categorical(filtered_labels)
+                unique_labels_for_this_header = cat_labels.categories.tolist()
+                label_idx = cat_labels.codes
+                label_counts = np.bincount(
+                    label_idx, minlength=len(unique_labels_for_this_header)
+                )
                 for i, ul in enumerate(unique_labels_for_this_header):
-                    n_matching_filtered = sum(f == ul for f in filtered_labels)
+                    n_matching_filtered = int(label_counts[i])
                     if assigned_for_header and ul not in assigned_for_header:
                         raise KeyError(
                             f"assign was provided, but label {ul} missing"
@@ -1467,65 +2047,117 @@ class Dataset:
                             f"{header} {ul} assigned {i} [{n_s} slides]"
                         )
 
-            def _process_cat_label(o):
-                if assigned_for_header:
-                    return assigned_for_header[o]
-                elif format == 'name':
-                    return o
-                else:
-                    return unique_labels_for_this_header.index(o)
+            # Categorical labels are returned as the assigned value,
+            # the label name, or the index into the sorted unique labels.
+            if header_is_float:
+                processed_labels = filtered_labels
+            elif assigned_for_header:
+                # Look up each unique label once, then index by code
+                label_map = [
+                    assigned_for_header[ul]
+                    for ul in unique_labels_for_this_header
+                ]
+                processed_labels = [label_map[i] for i in label_idx]
+            elif format == 'name':
+                processed_labels = filtered_labels
+            else:
+                processed_labels = label_idx.tolist()
 
             # Check for multiple, different labels per patient and warn
-            pt_assign = np.array(list(set(zip(filtered_pts, filtered_labels))))
-            unique_pt, counts = np.unique(pt_assign[:, 0], return_counts=True)
-            for pt in unique_pt[np.argwhere(counts > 1)][:, 0]:
-                dup_vals = pt_assign[pt_assign[:, 0] == pt][:, 1]
+            pt_assign = pd.DataFrame({
+                'patient': np.asarray(filtered_pts),
+                'label': np.asarray(filtered_labels)
+            }).drop_duplicates()
+            pt_assign = pt_assign[pt_assign.patient.duplicated(keep=False)]
+            for pt, dup_vals in pt_assign.groupby('patient')['label']:
                 dups = ", ".join([str(d) for d in dup_vals])
                 log.error(
                     f"{pt} has multiple labels (header {header}): {dups}"
                 )
 
-            # Assemble results dictionary
-            for slide, lbl in zip(filtered_slides, filtered_labels):
-                if not header_is_float:
-                    lbl = _process_cat_label(lbl)
-                if slide in results:
-                    results[slide] = sf.util.as_list(results[slide])
-                    results[slide] += [lbl]
-                elif header_is_float:
-                    results[slide] = [lbl]
-                else:
-                    results[slide] = lbl
+            label_columns.append((processed_labels, header_is_float))
             unique_labels[header] = unique_labels_for_this_header
+
+        # Assemble results dictionary. Slides are normally unique, so
+        # each slide's labels are gathered across headers in one pass.
+        if filtered_slides.is_unique:
+            if len(headers) > 1:
+                results = dict(zip(
+                    filtered_slides,
+                    map(list, zip(*[lbls for lbls, _ in label_columns]))
+                ))
+            elif label_columns[0][1]:
+                results = {
+                    slide: [lbl] for slide, lbl
+                    in zip(filtered_slides, label_columns[0][0])
+                }
+            else:
+                results = dict(zip(filtered_slides, label_columns[0][0]))
+        else:
+            for processed_labels, header_is_float in label_columns:
+                for slide, lbl in zip(filtered_slides, processed_labels):
+                    if slide in results:
+                        results[slide] = sf.util.as_list(results[slide])
+                        results[slide] += [lbl]
+                    elif header_is_float:
+                        results[slide] = [lbl]
+                    else:
+                        results[slide] = lbl
         if len(headers) == 1:
             return results, unique_labels[headers[0]]
         else:
             return results, unique_labels
 
-    def load_indices(self) -> Dict[str, np.ndarray]:
-        """Reads TFRecord indices. Needed for PyTorch."""
+    def load_indices(self, mmap: bool = False) -> Dict[str, np.ndarray]:
+        """Reads TFRecord indices. Needed for PyTorch.
 
-        pool = DPool(16)
+        Parsed indices are cached in binary ``<tfrecord>.index.npy`` files
+        next to the text ``<tfrecord>.index`` files, which are re-used while
+        the text index is unchanged. These files may be safely deleted.
+
+        Args:
+            mmap (bool): Memory-map the indices, rather than reading them
+                into memory. Index pages are then only read when accessed.
+                Defaults to False.
+
+        Returns:
+            Dict mapping tfrecord names to indices.
+        """
         tfrecords = self.tfrecords()
         indices = {}
-
-        def load_index(tfr):
-            index_name = join(dirname(tfr), path_to_name(tfr)+'.index')
-            tfr_name = path_to_name(tfr)
-            if not exists(index_name):
-                raise OSError(f"Could not find index path for TFRecord {tfr}")
-            if os.stat(index_name).st_size == 0:
-                index = None
+        if not tfrecords:
+            return indices
+        # Parsing text indices is CPU-bound Python, so use processes
+        num_workers = min(32, os.cpu_count() or 8, len(tfrecords))
+        chunksize = max(1, len(tfrecords) // (num_workers * 4))
+        with multiprocessing.Pool(num_workers) as pool:
+            if mmap:
+                # Memory maps cannot be returned from worker processes, so
+                # workers only parse and cache the binary indices, which
+                # are then mapped here.
+                for _ in tqdm(pool.imap_unordered(_cache_index,
+                                                  tfrecords,
+                                                  chunksize=chunksize),
+                              desc="Loading indices...",
+                              total=len(tfrecords),
+                              leave=False):
+                    pass
             else:
-                index = np.loadtxt(index_name, dtype=np.int64)
-            return tfr_name, index
-
-        for tfr_name, index in tqdm(pool.imap(load_index, tfrecords),
-                                    desc="Loading indices...",
-                                    total=len(tfrecords),
-                                    leave=False):
-            indices[tfr_name] = index
-        pool.close()
+                for tfr_name, index in tqdm(
+                    pool.imap_unordered(_load_index,
+                                        tfrecords,
+                                        chunksize=chunksize),
+                    desc="Loading indices...",
+                    total=len(tfrecords),
+                    leave=False
+                ):
+                    indices[tfr_name] = index
+            pool.close()
+            pool.join()
+        if mmap:
+            for tfr in tfrecords:
+                tfr_name, index = _load_index(tfr, mmap_mode='r')
+                indices[tfr_name] = index
         return indices
 
     def manifest(
@@ -1545,36 +2177,54 @@ class Dataset:
         """
         if key not in ('path', 'name'):
             raise ValueError("'key' must be in ['path, 'name']")
+        # Return copies of the records, so that callers cannot modify the
+        # cached manifest
+        if (key, filter) in self._manifest_cache:
+            return {
+                k: dict(v)
+                for k, v in self._manifest_cache[(key, filter)].items()
+            }
+        if key == 'name':
+            # Derive from the path-keyed manifest, which may already be cached
+            all_manifest = {
+                path_to_name(t): v
+                for t, v in self.manifest('path', filter=filter).items()
+            }
+            self._manifest_cache[(key, filter)] = all_manifest
+            return {k: dict(v) for k, v in all_manifest.items()}
 
         all_manifest = {}
         for source in self.sources:
-            if self.sources[source]['label'] is None:
+            if self._label is None:
                 continue
             tfrecord_dir = join(
                 self.sources[source]['tfrecords'],
-                self.sources[source]['label']
+                self._label
             )
             manifest_path = join(tfrecord_dir, "manifest.json")
             if not exists(manifest_path):
                 log.debug(f"No manifest at {tfrecord_dir}; creating now")
                 sf.io.update_manifest_at_dir(tfrecord_dir)
+                _clear_manifest_caches()
 
-            if exists(manifest_path):
-                relative_manifest = sf.util.load_json(manifest_path)
+            try:
+                stat_key = _stat_key(manifest_path)
+            except FileNotFoundError:
+                relative_manifest = {}  # type: Mapping[str, Mapping[str, int]]
             else:
-                relative_manifest = {}
-            global_manifest = {}
-            for record in relative_manifest:
-                k = join(tfrecord_dir, record)
-                global_manifest.update({k: relative_manifest[record]})
-            all_manifest.update(global_manifest)
+                relative_manifest = _read_manifest(manifest_path, stat_key)
+            # Copy each record, as the cached manifest must not be modified
+            all_manifest.update({
+                join(tfrecord_dir, record): dict(counts)
+                for record, counts in relative_manifest.items()
+            })
         # Now filter out any tfrecords that would be excluded by filters
         if filter:
-            filtered_tfrecords = self.tfrecords()
-            manifest_tfrecords = list(all_manifest.keys())
-            for tfr in manifest_tfrecords:
-                if tfr not in filtered_tfrecords:
-                    del(all_manifest[tfr])
+            filtered_tfrecords = set(self.tfrecords())
+            all_manifest = {
+                tfr: counts for tfr, counts in all_manifest.items()
+                if tfr in filtered_tfrecords
+            }
         # Log clipped tile totals if applicable
         for tfr in all_manifest:
             if tfr in self._clip:
@@ -1582,27 +2232,47 @@ class Dataset:
                                                    all_manifest[tfr]['total'])
             else:
                 all_manifest[tfr]['clipped'] = all_manifest[tfr]['total']
-        if key == 'path':
-            return all_manifest
-        else:
-            return {path_to_name(t): v for t, v in all_manifest.items()}
+        self._manifest_cache[(key, filter)] = all_manifest
+        return {k: dict(v) for k, v in all_manifest.items()}
 
     def patients(self) -> Dict[str, str]:
         """Returns a list of patient IDs from this dataset."""
-        result = {}  # type: Dict[str, str]
-        pairs = list(zip(
-            self.filtered_annotations['slide'],
-            self.filtered_annotations['patient']
-        ))
-        for slide, patient in pairs:
-            if slide in result and result[slide] != patient:
-                raise errors.AnnotationsError(
-                    f"Slide {slide} assigned to multiple patients: "
-                    f"({patient}, {result[slide]})"
-                )
-            else:
-                result[slide] = patient
-        return result
+        pairs = self.filtered_annotations[['slide', 'patient']]
+        pairs = pairs.drop_duplicates()
+        conflicts = pairs.slide.duplicated(keep=False)
+        if conflicts.any():
+            slide = pairs.slide[conflicts].iloc[0]
+            patients = pairs.patient[pairs.slide == slide].tolist()
+            raise errors.AnnotationsError(
+                f"Slide {slide} assigned to multiple patients: "
+                f"({', '.join(patients)})"
+            )
+        return dict(zip(pairs.slide, pairs.patient))
+
+    def _slide_meta(
+        self,
+        site_header: Optional[str] = None
+    ) -> Tuple[Dict[str, str], Optional[Dict[str, str]]]:
+        """Returns slide-to-patient and, optionally, slide-to-site mappings.
+
+        Both are read from the filtered annotations, so the site labels
+        do not need a separate pass through :meth:`Dataset.labels`.
+
+        Args:
+            site_header (str, optional): Annotation header with site labels.
+
+        Returns:
+            Dict mapping slides to patients, and dict mapping slides to
+            sites (None if site_header was not provided).
+        """
+        patients = self.patients()
+        if site_header is None:
+            return patients, None
+        ann = self.filtered_annotations
+        if site_header not in ann.columns:
+            raise errors.AnnotationsError(f"Missing column {site_header}.")
+        sites = dict(zip(ann.slide, ann[site_header]))
+        return patients, sites
 
     def remove_filter(self, **kwargs: Any) -> "Dataset":
         """Removes a specific filter from the active filters.
@@ -1620,7 +2290,7 @@ class Dataset:
         for kwarg in kwargs:
             if kwarg not in ('filters', 'filter_blank'):
                 raise ValueError(f'Unknown filtering argument {kwarg}')
-        ret = copy.deepcopy(self)
+        ret = self._clone()
         if 'filters' in kwargs:
             if not isinstance(kwargs['filters'], list):
                 raise TypeError("'filters' must be a list.")
@@ -1640,8 +2310,9 @@ class Dataset:
                         f"Filter_blank {f} not found in dataset (active "
                         f"filter_blank: {','.join(ret._filter_blank)})"
                     )
-                elif isinstance(ret._filter_blank, dict):
-                    del ret._filter_blank[ret._filter_blank.index(f)]
+                else:
+                    ret._filter_blank.remove(f)
+        ret._clear_cache()
         return ret
 
     def resize_tfrecords(self, tile_px: int) -> None:
@@ -1669,8 +2340,8 @@ class Dataset:
         rois_list = []
         for source in self.sources:
             rois_list += glob(join(self.sources[source]['roi'], "*.csv"))
-        slides = self.slides()
-        return [r for r in list(set(rois_list)) if path_to_name(r) in slides]
+        slides = set(self.slides())
+        return [r for r in set(rois_list) if path_to_name(r) in slides]
 
     def slide_paths(
         self,
@@ -1700,7 +2371,7 @@ class Dataset:
         paths = list(set(paths))
         # Filter paths
         if apply_filters:
-            filtered_slides = self.slides()
+            filtered_slides = set(self.slides())
             filtered_paths = [
                 p for p in paths if path_to_name(p) in filtered_slides
             ]
@@ -1719,10 +2390,11 @@ class Dataset:
             raise errors.AnnotationsError(
                 f"{'slide'} not found in annotations file."
             )
-        ann = self.filtered_annotations
-        ann = ann.loc[~ann.slide.isin(sf.util.EMPTY_ANNOTATIONS)]
-        slides = ann.slide.unique().tolist()
-        return slides
+        if self._slides_cache is None:
+            ann = self.filtered_annotations
+            ann = ann.loc[~ann.slide.isin(_EMPTY_ANNOTATIONS)]
+            self._slides_cache = ann.slide.unique().tolist()
+        return list(self._slides_cache)
 
     def split_tfrecords_by_roi(self, destination: Path) -> None:
         """Split dataset tfrecords into separate tfrecords according to ROI.
@@ -1740,59 +2412,42 @@ class Dataset:
         tfrecords = self.tfrecords()
         slides = {path_to_name(s): s for s in self.slide_paths()}
         rois = self.rois()
-        manifest = self.manifest()
 
         if self.tile_px is None or self.tile_um is None:
             raise errors.DatasetError(
                 "tile_px and tile_um must be non-zero to process TFRecords."
             )
 
-        for tfr in tfrecords:
-            slidename = path_to_name(tfr)
-            if slidename not in slides:
-                continue
-            try:
-                slide = WSI(
-                    slides[slidename],
-                    self.tile_px,
-                    self.tile_um,
-                    rois=rois,
-                    roi_method='inside'
-                )
-            except errors.SlideLoadError as e:
-                log.error(e)
-                continue
-            parser = sf.io.get_tfrecord_parser(
-                tfr,
-                decode_images=False,
-                to_numpy=True
-            )
-            if parser is None:
-                log.error(f"Could not read TFRecord {tfr}; skipping")
-                continue
-            reader = sf.io.TFRecordDataset(tfr)
-            if not exists(join(destination, 'inside')):
-                os.makedirs(join(destination, 'inside'))
-            if not exists(join(destination, 'outside')):
-                os.makedirs(join(destination, 'outside'))
-            in_path = join(destination, 'inside', f'{slidename}.tfrecords')
-            out_path = join(destination, 'outside', f'{slidename}.tfrecords')
-            inside_roi_writer = sf.io.TFRecordWriter(in_path)
-            outside_roi_writer = sf.io.TFRecordWriter(out_path)
-            for record in tqdm(reader, total=manifest[tfr]['total']):
-                parsed = parser(record)
-                loc_x, loc_y = parsed['loc_x'], parsed['loc_y']
-                tile_in_roi = any([
-                    annPoly.contains(sg.Point(loc_x, loc_y))
-                    for annPoly in slide.annPolys
-                ])
-                record_bytes = sf.io.read_and_return_record(record, parser)
-                if tile_in_roi:
-                    inside_roi_writer.write(record_bytes)
-                else:
-                    outside_roi_writer.write(record_bytes)
-            inside_roi_writer.close()
-            outside_roi_writer.close()
+        to_split = [
+            (tfr, slides[path_to_name(tfr)]) for tfr in tfrecords
+            if path_to_name(tfr) in slides
+        ]
+        if not to_split:
+            return
+        for subfolder in ('inside', 'outside'):
+            if not exists(join(destination, subfolder)):
+                os.makedirs(join(destination, subfolder))
+
+        # Split tfrecords concurrently. Threads are used rather than
+        # processes, as the tfrecords are read with the active backend.
+        manifest = self.manifest()
+        total = sum(manifest[tfr]['total'] for tfr, _ in to_split
+                    if tfr in manifest)
+        pb = tqdm(desc='Splitting tfrecords by ROI...', total=total)
+        pool = DPool(min(16, len(to_split)))
+        split_fn = partial(
+            _split_tfrecord_by_roi,
+            rois=rois,
+            tile_px=self.tile_px,
+            tile_um=self.tile_um,
+            destination=destination,
+            pb=pb
+        )
+        for _ in pool.imap_unordered(split_fn, to_split):
+            pass
+        pool.close()
+        pb.close()
+        pool.join()
 
     def tensorflow(
         self,
@@ -1855,6 +2510,15 @@ class Dataset:
                 performance. Defaults to False.
             drop_last (bool, optional): Drop the last non-full batch.
                 Defaults to False.
+            cache (str, optional): Cache decoded tiles, before augmentation,
+                to this file, or in memory if an empty string. If infinite,
+                cached tiles are reshuffled for each pass with a buffer of
+                1024 tiles; finite datasets replay the order of the first
+                pass. Cannot be used with balancing (prob_weights) if
+                infinite. Defaults to None (no caching).
+            round_robin (bool, optional): Without balancing, read tiles in
+                turn from up to 32 tfrecords at a time, rather than from a
+                randomly selected tfrecord for each tile. Defaults to False.
         """
 
         from slideflow.io.tensorflow import interleave
@@ -1862,7 +2526,7 @@ class Dataset:
         tfrecords = self.tfrecords()
         if not tfrecords:
             raise errors.TFRecordsNotFoundError
-        self.verify_img_format()
+        self.verify_img_format(tfrecords)
         if self.tile_px is None:
             raise errors.DatasetError("tile_px and tile_um must be non-zero"
                                       "to create dataloaders.")
@@ -1892,11 +2556,9 @@ class Dataset:
             log.info(f'Using realtime {normalizer.method} normalization')
 
         tfrecord_list = self.tfrecords()
-        reports = []
         log.info('Generating TFRecords report...')
-        # Get images for report
-        for tfr in tfrecord_list:
-            print(f'\r\033[KWorking on {col.green(path_to_name(tfr))}', end='')
+
+        def get_report(tfr):
             dataset = sf.io.TFRecordDataset(tfr)
             parser = sf.io.get_tfrecord_parser(
                 tfr,
@@ -1905,7 +2567,7 @@ class Dataset:
                 decode_images=False
             )
             if not parser:
-                continue
+                return None
             sample_tiles = []
             for i, record in enumerate(dataset):
                 if i > 9:
@@ -1914,10 +2576,22 @@ class Dataset:
                 if normalizer:
                     image_raw_data = normalizer.jpeg_to_jpeg(image_raw_data)
                 sample_tiles += [image_raw_data]
-            reports += [SlideReport(sample_tiles, tfr)]
+            return SlideReport(sample_tiles, tfr)
+
+        # Get images for report, reading tfrecords concurrently.
+        # Reports are kept in the same order as the tfrecords.
+        reports = []
+        if tfrecord_list:
+            pool = DPool(min(16, len(tfrecord_list)))
+            for report in tqdm(pool.imap(get_report, tfrecord_list),
+                               desc='Reading tfrecords...',
+                               total=len(tfrecord_list),
+                               leave=False):
+                if report is not None:
+                    reports += [report]
+            pool.close()
 
         # Generate and save PDF
-        print('\r\033[K', end='')
         log.info('Generating PDF (this may take some time)...')
         pdf_report = ExtractionReport(reports, title='TFRecord Report')
         timestring = datetime.now().strftime('%Y%m%d-%H%M%S')
@@ -1948,17 +2622,24 @@ class Dataset:
         Returns:
             None
         """
-        slide_paths = {
-            sf.util.path_to_name(sp): sp for sp in self.slide_paths()
-        }
+        slide_paths = {path_to_name(sp): sp for sp in self.slide_paths()}
         if not self.tile_px or not self.tile_um:
             raise errors.DatasetError(
                 "Dataset tile_px & tile_um must be set to create TFRecords."
             )
-        for tfr in sf.util.as_list(tfrecord):
-            name = sf.util.path_to_name(tfr)
-            if name not in slide_paths:
-                raise errors.SlideNotFoundError(f'Unable to find slide {name}')
+        tfrecords = sf.util.as_list(tfrecord)
+        names = [path_to_name(tfr) for tfr in tfrecords]
+        # Check all slides up front, rather than failing partway through
+        missing = [name for name in names if name not in slide_paths]
+        if len(missing) == 1:
+            raise errors.SlideNotFoundError(
+                f'Unable to find slide {missing[0]}'
+            )
+        elif missing:
+            raise errors.SlideNotFoundError(
+                f'Unable to find slides {", ".join(missing)}'
+            )
+        for tfr, name in zip(tfrecords, names):
             sf.util.tfrecord_heatmap(
                 tfrecord=tfr,
                 slide=slide_paths[name],
@@ -1981,6 +2662,9 @@ class Dataset:
         if source and source not in self.sources.keys():
             log.error(f"Dataset {source} not found.")
             return []
+        if source in self._tfrecords_cache:
+            return list(self._tfrecords_cache[source])
+        requested_source = source
         if source is None:
             sources_to_search = list(self.sources.keys())
         else:
@@ -1994,19 +2678,21 @@ class Dataset:
             if label is None:
                 continue
             tfrecord_path = join(tfrecords, label)
-            if not exists(tfrecord_path):
+            try:
+                stat_key = _stat_key(tfrecord_path)
+            except FileNotFoundError:
                 log.debug(
                     f"TFRecords path not found: {col.green(tfrecord_path)}"
                 )
                 continue
-            folders_to_search += [tfrecord_path]
-        for folder in folders_to_search:
-            tfrecords_list += glob(join(folder, "*.tfrecords"))
+            folders_to_search += [(tfrecord_path, stat_key)]
+        for folder, stat_key in folders_to_search:
+            tfrecords_list += _list_tfrecords(folder, stat_key)
         tfrecords_list = list(set(tfrecords_list))
 
         # Filter the list by filters
         if self.annotations is not None:
-            slides = self.slides()
+            slides = set(self.slides())
             filtered_tfrecords_list = [
                 tfrecord for tfrecord in tfrecords_list
                 if path_to_name(tfrecord) in slides
@@ -2022,12 +2708,14 @@ class Dataset:
             self.update_manifest()
             manifest = self.manifest(filter=False)
         if self.min_tiles:
-            return [
+            filtered = [
                 f for f in filtered
                 if manifest[f]['total'] >= self.min_tiles
             ]
         else:
-            return [f for f in filtered if manifest[f]['total'] > 0]
+            filtered = [f for f in filtered if manifest[f]['total'] > 0]
+        self._tfrecords_cache[requested_source] = filtered
+        return list(filtered)
 
     def tfrecords_by_subfolder(self, subfolder: Path) -> List[str]:
         """Returns a list of all tfrecords in a specific subfolder,
@@ -2042,11 +2730,11 @@ class Dataset:
         tfrecords_list = []
         folders_to_search = []
         for source in self.sources:
-            if self.sources[source]['label'] is None:
+            if self._label is None:
                 continue
             base_dir = join(
                 self.sources[source]['tfrecords'],
-                self.sources[source]['label']
+                self._label
             )
             tfrecord_path = join(base_dir, subfolder)
             if not exists(tfrecord_path):
@@ -2057,18 +2745,18 @@ class Dataset:
                 )
             folders_to_search += [tfrecord_path]
         for folder in folders_to_search:
-            tfrecords_list += glob(join(folder, "*.tfrecords"))
+            tfrecords_list += _list_tfrecords(folder, _stat_key(folder))
         return tfrecords_list
 
     def tfrecords_folders(self) -> List[str]:
         """Returns folders containing tfrecords."""
         folders = []
         for source in self.sources:
-            if self.sources[source]['label'] is None:
+            if self._label is None:
                 continue
             folders += [join(
                 self.sources[source]['tfrecords'],
-                self.sources[source]['label']
+                self._label
             )]
         return folders
 
@@ -2131,24 +2819,25 @@ class Dataset:
         slide_list = self.slide_paths()
         rois = self.rois()
         log.info(f'Saving thumbnails to {col.green(outdir)}')
-        for slide_path in slide_list:
-            fmt_name = col.green(path_to_name(slide_path))
-            log.info(f'Working on {fmt_name}...')
-            try:
-                whole_slide = WSI(slide_path,
-                                  tile_px=1000,
-                                  tile_um=1000,
-                                  stride_div=1,
-                                  enable_downsample=enable_downsample,
-                                  rois=rois,
-                                  roi_method='inside' if roi else 'auto')
-            except errors.MissingROIError:
-                log.info(f"Skipping {whole_slide.name}; missing ROI")
-            if roi:
-                thumb = whole_slide.thumb(rois=True)
-            else:
-                thumb = whole_slide.square_thumb(size)
-            thumb.save(join(outdir, f'{whole_slide.name}.png'))
+        if slide_list:
+            # Slides are memory-intensive, so limit the number of workers
+            ctx = multiprocessing.get_context('fork')
+            thumb_fn = partial(
+                _save_thumbnail,
+                outdir=outdir,
+                size=size,
+                roi=roi,
+                enable_downsample=enable_downsample,
+                rois=rois
+            )
+            num_workers = min(os.cpu_count() or 8, 8, len(slide_list))
+            with ctx.Pool(num_workers) as pool:
+                for _ in tqdm(pool.imap_unordered(thumb_fn, slide_list),
+                              desc='Generating thumbnails...',
+                              total=len(slide_list)):
+                    pass
+                pool.close()
+                pool.join()
         log.info('Thumbnail generation complete.')
 
     def training_validation_split(
@@ -2172,7 +2861,8 @@ class Dataset:
         val_k_fold: Optional[int] = None,
         k_fold_iter: Optional[int] = None,
         site_labels: Optional[Dict[str, str]] = None,
-        read_only: bool = False
+        read_only: bool = False,
+        seed: Optional[int] = None
     ) -> Tuple["Dataset", "Dataset"]:
         """From a specified subfolder in the project's main TFRecord folder,
         prepare a training set and validation set.
@@ -2203,6 +2893,8 @@ class Dataset:
                 Used for site preserved cross validation.
             read_only (bool): Prevents writing validation splits to file.
                 Defaults to False.
+            seed (int, optional): Seed for shuffling patients. If provided,
+                newly generated splits are reproducible. Defaults to None.
 
         Returns:
             slideflow.Dataset: training dataset,
@@ -2222,8 +2914,12 @@ class Dataset:
                 "k-fold-preserved-site requires site_labels (dict of "
                 "patients:sites, or name of annotation column header"
             )
+        # Look up patients, and sites if given as an annotation header,
+        # from the filtered annotations at the same time
         if isinstance(site_labels, str):
-            site_labels, _ = self.labels(site_labels, format='name')
+            patients, site_labels = self._slide_meta(site_labels)
+        else:
+            patients, _ = self._slide_meta()
         if val_strategy == 'k-fold-preserved-site' and site_labels is None:
             raise errors.DatasetSplitError(
                 f"Must supply site_labels for strategy {val_strategy}"
@@ -2234,10 +2930,7 @@ class Dataset:
             )
 
         # Prepare dataset
-        patients = self.patients()
         splits_file = splits
-        training_tfrecords = []
-        val_tfrecords = []
         accepted_split = None
         slide_list = list(labels.keys())
 
@@ -2246,31 +2939,36 @@ class Dataset:
         tfrecord_dir_list = self.tfrecords()
         if not len(tfrecord_dir_list):
             raise errors.TFRecordsNotFoundError
-        tfrecord_dir_list_names = [
-            tfr.split('/')[-1][:-10] for tfr in tfrecord_dir_list
-        ]
-        patients_dict = {}
+        tfr_by_name = {path_to_name(tfr): tfr for tfr in tfrecord_dir_list}
+        slides_by_patient = defaultdict(list)  # type: Dict[str, List[str]]
+        label_by_patient = {}  # type: Dict[str, Any]
         num_warned = 0
+        get_patient = patients.__getitem__ if patients else (lambda s: s)
+        # Bootstrap and no-validation splits are neither saved nor compared
+        # with saved splits, so only need the slides for each patient.
+        needs_labels = val_strategy not in ('bootstrap', 'none')
         for slide in slide_list:
-            patient = slide if not patients else patients[slide]
             # Skip slides not found in directory
-            if slide not in tfrecord_dir_list_names:
+            if slide not in tfr_by_name:
                 log.debug(f"Slide {slide} missing tfrecord, skipping")
                 num_warned += 1
                 continue
-            if patient not in patients_dict:
-                patients_dict[patient] = {
-                    'outcome_label': labels[slide],
-                    'slides': [slide]
-                }
-            elif patients_dict[patient]['outcome_label'] != labels[slide]:
-                ol = patients_dict[patient]['outcome_label']
-                ok = labels[slide]
+            patient = get_patient(slide)
+            slides_by_patient[patient].append(slide)
+            if not needs_labels:
+                continue
+            label = labels[slide]
+            ol = label_by_patient.setdefault(patient, label)
+            if ol != label:
                 raise errors.DatasetSplitError(
-                    f"Multiple labels found for {patient} ({ol}, {ok})"
+                    f"Multiple labels found for {patient} ({ol}, {label})"
                 )
-            else:
-                patients_dict[patient]['slides'] += [slide]
+        patients_dict = {
+            patient: {
+                'outcome_label': label_by_patient[patient],
+                'slides': pt_slides
+            } for patient, pt_slides in slides_by_patient.items()
+        } if needs_labels else {}  # type: Dict[str, Dict]
 
         # Add site labels to the patients dict if doing
         # preserved-site cross-validation
@@ -2278,9 +2976,9 @@ class Dataset:
             assert site_labels is not None
             site_slide_list = list(site_labels.keys())
             for slide in site_slide_list:
-                patient = slide if not patients else patients[slide]
+                patient = get_patient(slide)
                 # Skip slides not found in directory
-                if slide not in tfrecord_dir_list_names:
+                if slide not in tfr_by_name:
                     continue
                 if 'site' not in patients_dict[patient]:
                     patients_dict[patient]['site'] = site_labels[slide]
@@ -2293,18 +2991,21 @@ class Dataset:
                     )
         if num_warned:
             log.warning(f"{num_warned} slides missing tfrecords, skipping")
-        patients_list = list(patients_dict.keys())
-        sorted_patients = [p for p in patients_list]
-        sorted_patients.sort()
-        shuffle(patients_list)
+        patients_list = list(slides_by_patient.keys())
+        patients_set = frozenset(patients_list)
+        rng = random.Random(seed) if seed is not None else None
+        (rng or random).shuffle(patients_list)
+
+        def patient_slides(pts):
+            # Flatten the slide lists of the given patients
+            return list(chain.from_iterable(
+                slides_by_patient[p] for p in pts
+            ))
 
         # Create and log a validation subset
         if val_strategy == 'none':
             log.info("val_strategy is None; skipping validation")
-            train_slides = np.concatenate([
-                patients_dict[patient]['slides']
-                for patient in patients_dict.keys()
-            ]).tolist()
+            train_slides = patient_slides(slides_by_patient)
             val_slides = []
         elif val_strategy == 'bootstrap':
             assert val_fraction is not None
@@ -2317,14 +3018,8 @@ class Dataset:
             train_patients = patients_list[num_val:]
             if not len(val_patients) or not len(train_patients):
                 raise errors.InsufficientDataForSplitError
-            val_slides = np.concatenate([
-                patients_dict[patient]['slides']
-                for patient in val_patients
-            ]).tolist()
-            train_slides = np.concatenate([
-                patients_dict[patient]['slides']
-                for patient in train_patients
-            ]).tolist()
+            val_slides = patient_slides(val_patients)
+            train_slides = patient_slides(train_patients)
         else:
             # Try to load validation split
             if (not splits_file or not exists(splits_file)):
@@ -2341,13 +3036,12 @@ class Dataset:
                     continue
 
                 # Then, check if patient lists are the same
-                sp_pts = list(split['patients'].keys())
-                sp_pts.sort()
-                if sp_pts == sorted_patients:
+                sp_pts = split['patients']
+                if (len(sp_pts) == len(patients_set)
+                   and patients_set.issuperset(sp_pts)):
                     # Finally, check if outcome variables are the same
-                    c1 = [patients_dict[p]['outcome_label'] for p in sp_pts]
-                    c2 = [split['patients'][p]['outcome_label']for p in sp_pts]
-                    if c1 == c2:
+                    if all(patients_dict[p]['outcome_label']
+                           == sp_pts[p]['outcome_label'] for p in sp_pts):
                         log.info(
                             f"Using {val_strategy} validation split detected"
                             f" at {col.green(splits_file)} (ID: {split_id})"
@@ -2375,14 +3069,8 @@ class Dataset:
                     train_patients = patients_list[num_val:]
                     if not len(val_patients) or not len(train_patients):
                         raise errors.InsufficientDataForSplitError
-                    val_slides = np.concatenate([
-                        patients_dict[patient]['slides']
-                        for patient in val_patients
-                    ]).tolist()
-                    train_slides = np.concatenate([
-                        patients_dict[patient]['slides']
-                        for patient in train_patients
-                    ]).tolist()
+                    val_slides = patient_slides(val_patients)
+                    train_slides = patient_slides(train_patients)
                     new_split['tfrecords']['validation'] = val_slides
                     new_split['tfrecords']['training'] = train_slides
 
@@ -2393,17 +3081,19 @@ class Dataset:
                         k_fold_patients = split_patients_preserved_site(
                             patients_dict,
                             val_k_fold,
-                            balance='outcome_label'
+                            balance='outcome_label',
+                            rng=rng
                         )
                     elif model_type == 'categorical':
                         k_fold_patients = split_patients_balanced(
                             patients_dict,
                             val_k_fold,
-                            balance='outcome_label'
+                            balance='outcome_label',
+                            rng=rng
                         )
                     else:
                         k_fold_patients = split_patients(
-                            patients_dict, val_k_fold
+                            patients_dict, val_k_fold, rng=rng
                         )
                     # Verify at least one patient is in each k_fold group
                     if (len(k_fold_patients) != val_k_fold
@@ -2411,22 +3101,15 @@ class Dataset:
                         raise errors.InsufficientDataForSplitError
                     train_patients = []
                     for k in range(1, val_k_fold+1):
-                        new_split['tfrecords'][f'k-fold-{k}'] = np.concatenate(
-                            [patients_dict[patient]['slides']
-                             for patient in k_fold_patients[k-1]]
-                        ).tolist()
+                        new_split['tfrecords'][f'k-fold-{k}'] = (
+                            patient_slides(k_fold_patients[k-1])
+                        )
                         if k == k_fold_iter:
                             val_patients = k_fold_patients[k-1]
                         else:
                             train_patients += k_fold_patients[k-1]
-                    val_slides = np.concatenate([
-                        patients_dict[patient]['slides']
-                        for patient in val_patients
-                    ]).tolist()
-                    train_slides = np.concatenate([
-                        patients_dict[patient]['slides']
-                        for patient in train_patients
-                    ]).tolist()
+                    val_slides = patient_slides(val_patients)
+                    train_slides = patient_slides(train_patients)
                 else:
                     raise errors.DatasetSplitError(
                         f"Unknown validation strategy {val_strategy}."
@@ -2434,7 +3117,7 @@ class Dataset:
                 # Write the new split to log
                 loaded_splits += [new_split]
                 if not read_only and splits_file:
-                    sf.util.write_json(loaded_splits, splits_file)
+                    _append_split(splits_file, loaded_splits)
             else:
                 # Use existing split
                 if val_strategy == 'fixed':
@@ -2444,11 +3127,11 @@ class Dataset:
                     assert val_k_fold is not None
                     k_id = f'k-fold-{k_fold_iter}'
                     val_slides = accepted_split['tfrecords'][k_id]
-                    train_slides = np.concatenate([
+                    train_slides = list(chain.from_iterable(
                         accepted_split['tfrecords'][f'k-fold-{ki}']
                         for ki in range(1, val_k_fold+1)
                         if ki != k_fold_iter
-                    ]).tolist()
+                    ))
                 else:
                     raise errors.DatasetSplitError(
                         f"Unknown val_strategy {val_strategy} requested."
@@ -2457,30 +3140,26 @@ class Dataset:
             # Perform final integrity check to ensure no patients
             # are in both training and validation slides
             if patients:
-                validation_pt = list(set([patients[s] for s in val_slides]))
-                training_pt = list(set([patients[s] for s in train_slides]))
+                validation_pt = {patients[s] for s in val_slides}
+                training_pt = {patients[s] for s in train_slides}
             else:
-                validation_pt, training_pt = val_slides, train_slides
-            if sum([pt in training_pt for pt in validation_pt]):
+                validation_pt, training_pt = set(val_slides), set(train_slides)
+            if not validation_pt.isdisjoint(training_pt):
                 raise errors.DatasetSplitError(
                     "At least one patient is in both val and training sets."
                 )
 
-            # Return list of tfrecords
-            val_tfrecords = [
-                tfr for tfr in tfrecord_dir_list
-                if path_to_name(tfr) in val_slides
-            ]
-            training_tfrecords = [
-                tfr for tfr in tfrecord_dir_list
-                if path_to_name(tfr) in train_slides
-            ]
+        # Return list of tfrecords
+        val_tfrecords = [
+            tfr_by_name[s] for s in val_slides if s in tfr_by_name
+        ]
+        training_tfrecords = [
+            tfr_by_name[s] for s in train_slides if s in tfr_by_name
+        ]
         assert(len(val_tfrecords) == len(val_slides))
         assert(len(training_tfrecords) == len(train_slides))
-        training_dts = copy.deepcopy(self)
-        training_dts = training_dts.filter(filters={'slide': train_slides})
-        val_dts = copy.deepcopy(self)
-        val_dts = val_dts.filter(filters={'slide': val_slides})
+        training_dts = self.filter(filters={'slide': train_slides})
+        val_dts = self.filter(filters={'slide': val_slides})
         assert(sorted(training_dts.tfrecords()) == sorted(training_tfrecords))
         assert(sorted(val_dts.tfrecords()) == sorted(val_tfrecords))
         return training_dts, val_dts
@@ -2490,6 +3169,7 @@ class Dataset:
         labels: Optional[Dict[str, Any]] = None,
         batch_size: Optional[int] = None,
         rebuild_index: bool = False,
+        mmap_indices: bool = False,
         **kwargs: Any
     ) -> "DataLoader":
         """Returns a PyTorch DataLoader object that interleaves tfrecords.
@@ -2505,6 +3185,10 @@ class Dataset:
             batch_size (int): Batch size.
             rebuild_index (bool): Re-build index files even if already present.
                 Defaults to True.
+            mmap_indices (bool): Memory-map the tfrecord indices, rather than
+                reading them into memory. Uses one memory map per tfrecord,
+                which may exceed the system limit (vm.max_map_count) for
+                large datasets. Defaults to False.
 
         Keyword Args:
             onehot (bool, optional): Onehot encode labels. Defaults to False.
@@ -2553,14 +3237,23 @@ class Dataset:
         tfrecords = self.tfrecords()
         if not tfrecords:
             raise errors.TFRecordsNotFoundError
-        self.verify_img_format()
+        self.verify_img_format(tfrecords)
 
-        if self.prob_weights:
-            prob_weights = [self.prob_weights[tfr] for tfr in tfrecords]
+        # Gather indices and weights in a single pass over the tfrecords
+        # Memory maps are not cached, so that they are released
+        # with the dataloader.
+        if mmap_indices:
+            _idx_dict = self.load_indices(mmap=True)
         else:
-            prob_weights = None
-        _idx_dict = self.load_indices()
-        indices = [_idx_dict[path_to_name(tfr)] for tfr in tfrecords]
+            _idx_dict = self._cached_indices()
+        tfr_names = self._tfrecord_names()
+        _pw = self.prob_weights
+        indices = []
+        prob_weights = [] if _pw else None  # type: Optional[List[float]]
+        for tfr in tfrecords:
+            indices.append(_idx_dict[tfr_names[tfr]])
+            if _pw:
+                prob_weights.append(_pw[tfr])  # type: ignore
         return interleave_dataloader(tfrecords=tfrecords,
                                      img_size=self.tile_px,
                                      batch_size=batch_size,
@@ -2577,8 +3270,9 @@ class Dataset:
         Returns:
             :class:`slideflow.dataset.Dataset` object.
         """
-        ret = copy.deepcopy(self)
+        ret = self._clone()
         ret._clip = {}
+        ret._clear_cache()
         return ret
 
     def update_manifest(self, force_update: bool = False) -> None:
@@ -2594,6 +3288,8 @@ class Dataset:
                 directory=tfr_folder,
                 force_update=force_update
             )
+        _clear_manifest_caches()
+        self._clear_cache()
 
     def update_annotations_with_slidenames(
         self,
@@ -2604,92 +3300,67 @@ class Dataset:
         that are already present in the annotations file.
         """
 
-        header, _ = sf.util.read_annotations(annotations_file)
+        # Read the annotations file once; the table is re-used when writing.
+        # Values are kept as written, so that they are rewritten unchanged.
+        try:
+            ann = _read_annotations_csv(annotations_file, na_filter=False)
+        except pd.errors.EmptyDataError:
+            ann = pd.DataFrame()
         slide_list = self.slide_paths(apply_filters=False)
 
         # First, load all patient names from the annotations file
-        try:
-            patient_index = header.index('patient')
-        except ValueError:
+        if 'patient' not in ann.columns:
             raise errors.AnnotationsError(
                 f"Patient header {'patient'} not found in annotations."
             )
-        patients = []
         pt_to_slide = {}
-        with open(annotations_file) as csv_file:
-            csv_reader = csv.reader(csv_file, delimiter=',')
-            header = next(csv_reader)
-            for row in csv_reader:
-                patients.extend([row[patient_index]])
-        patients = list(set(patients))
+        patients = set(ann['patient'])
         log.debug(f"Number of patients in annotations: {len(patients)}")
         log.debug(f"Slides found: {len(slide_list)}")
 
+        # Compute each slide's short name once
+        slide_names = [path_to_name(file) for file in slide_list]
+        short_of = {slide: _shortname(slide) for slide in slide_names}
+
         # Then, check for sets of slides that would match to the same patient;
         # due to ambiguity, these will be skipped.
-        n_occur = {}
-        for slide in slide_list:
-            if _shortname(slide) not in n_occur:
-                n_occur[_shortname(slide)] = 1
-            else:
-                n_occur[_shortname(slide)] += 1
-        slides_to_skip = [s for s in slide_list if n_occur[_shortname(s)] > 1]
+        n_occur = Counter(_shortname(file) for file in slide_list)
+        slides_to_skip = {
+            f for f in slide_list if n_occur[_shortname(f)] > 1
+        }
 
         # Next, search through the slides folder for all valid slide files
-        for file in slide_list:
-            slide = path_to_name(file)
+        for slide in slide_names:
+            short = short_of[slide]
             # First, skip this slide due to ambiguity if needed
             if slide in slides_to_skip:
                 log.warning(f"Skipping slide {slide} due to ambiguity")
             # Then, make sure the shortname and long name
             # aren't both in the annotation file
-            if ((slide != _shortname(slide))
+            if ((slide != short)
                and (slide in patients)
-               and (_shortname(slide) in patients)):
+               and (short in patients)):
                 log.warning(f"Skipping slide {slide} due to ambiguity")
             # Check if either the slide name or the shortened version
             # are in the annotation file
-            if any(x in patients for x in [slide, _shortname(slide)]):
-                slide = slide if slide in patients else _shortname(slide)
+            if slide in patients or short in patients:
+                slide = slide if slide in patients else short
                 pt_to_slide.update({slide: slide})
 
-        # Now, write the assocations
-        n_updated = 0
-        n_missing = 0
-        with open(annotations_file) as csv_file:
-            csv_reader = csv.reader(csv_file, delimiter=',')
-            header = next(csv_reader)
-            with open('temp.csv', 'w') as csv_outfile:
-                csv_writer = csv.writer(csv_outfile, delimiter=',')
-
-                # Write to existing "slide" column in the annotations file,
-                # otherwise create new column
-                try:
-                    slide_index = header.index('slide')
-                except ValueError:
-                    header.extend(['slide'])
-                    csv_writer.writerow(header)
-                    for row in csv_reader:
-                        patient = row[patient_index]
-                        if patient in pt_to_slide:
-                            row.extend([pt_to_slide[patient]])
-                            n_updated += 1
-                        else:
-                            row.extend([""])
-                            n_missing += 1
-                        csv_writer.writerow(row)
-                else:
-                    csv_writer.writerow(header)
-                    for row in csv_reader:
-                        pt = row[patient_index]
-                        # Only write column if no slide is in the annotation
-                        if (pt in pt_to_slide) and (row[slide_index] == ''):
-                            row[slide_index] = pt_to_slide[pt]
-                            n_updated += 1
-                        elif ((pt not in pt_to_slide)
-                              and (row[slide_index] == '')):
-                            n_missing += 1
-                        csv_writer.writerow(row)
+        # Now, write the assocations to the existing "slide" column in the
+        # annotations file (otherwise create a new column), only filling
+        # rows where no slide is already in the annotation
+        if 'slide' not in ann.columns:
+            ann['slide'] = ''
+        no_slide = (ann['slide'] == '')
+        has_match = ann['patient'].isin(pt_to_slide)
+        to_update = no_slide & has_match
+        ann.loc[to_update, 'slide'] = ann.loc[to_update, 'patient'].map(
+            pt_to_slide
+        )
+        n_updated = int(to_update.sum())
+        n_missing = int((no_slide & ~has_match).sum())
+        ann.to_csv('temp.csv', index=False)
         if n_updated:
             log.info(f"Done; associated slides with {n_updated} annotations.")
             if n_missing:
@@ -2716,51 +3387,69 @@ class Dataset:
             return
 
         # Verify no duplicate slide names are found
-        ann = self.annotations.loc[self.annotations.slide.isin(self.slides())]
-        if not ann.slide.is_unique:
+        slide_col = self.annotations.slide
+        if not slide_col[slide_col.isin(self.slides())].is_unique:
             raise errors.AnnotationsError(
                 "Duplicate slide names detected in the annotation file."
             )
 
         # Verify all slides in the annotation column are valid
-        n_missing = len(self.annotations.loc[
-            (self.annotations.slide.isin(['', ' '])
-            | self.annotations.slide.isna())
-        ])
+        n_missing = int(
+            (slide_col.isin(_EMPTY_ANNOTATIONS) | slide_col.isna()).sum()
+        )
         if n_missing == 1:
             log.warn(f"1 patient does not have a slide assigned.")
         if n_missing > 1:
             log.warn(f"{n_missing} patients do not have a slide assigned.")
 
-    def verify_img_format(self) -> Optional[str]:
+    def verify_img_format(
+        self,
+        tfrecords: Optional[List[str]] = None
+    ) -> Optional[str]:
         """Verify that all tfrecords have the same image format (PNG/JPG).
 
+        Args:
+            tfrecords (list(str), optional): Tfrecords to verify, if already
+                retrieved by the caller. Defaults to None (all tfrecords
+                in the dataset).
+
         Returns:
             str: image format (png or jpeg)
         """
-        tfrecords = self.tfrecords()
-        if len(tfrecords):
-            img_formats = []
-            pb = tqdm(
-                tfrecords,
-                desc="Verifying tfrecord formats...",
-                leave=False
+        if tfrecords is None:
+            tfrecords = self.tfrecords()
+        if not len(tfrecords):
+            return None
+
+        def detect_format(tfr):
+            return tfr, sf.io.detect_tfrecord_img_format(tfr)
+
+        # Formats are detected concurrently, stopping as soon as a
+        # second format is found.
+        first_with_format = {}  # type: Dict[str, str]
+        pool = DPool(min(32, len(tfrecords)))
+        pb = tqdm(
+            pool.imap_unordered(detect_format, tfrecords),
+            desc="Verifying tfrecord formats...",
+            total=len(tfrecords),
+            leave=False
+        )
+        for tfr, fmt in pb:
+            if fmt is not None and fmt not in first_with_format:
+                first_with_format[fmt] = tfr
+                if len(first_with_format) > 1:
+                    break
+        pb.close()
+        pool.terminate()
+        if len(first_with_format) > 1:
+            log_msg = "Mismatched TFRecord image formats:\n"
+            for fmt, tfr in first_with_format.items():
+                log_msg += f"{tfr}: {fmt}\n"
+            log.error(log_msg)
+            raise errors.MismatchedImageFormatsError(
+                "Mismatched TFRecord image formats detected"
             )
-            for tfr in pb:
-                fmt = sf.io.detect_tfrecord_format(tfr)[-1]
-                if fmt is not None:
-                    img_formats += [fmt]
-            if len(set(img_formats)) > 1:
-                log_msg = "Mismatched TFRecord image formats:\n"
-                for tfr, fmt in zip(tfrecords, img_formats):
-                    log_msg += f"{tfr}: {fmt}\n"
-                log.error(log_msg)
-                raise errors.MismatchedImageFormatsError(
-                    "Mismatched TFRecord image formats detected"
-                )
-            if len(img_formats):
-                return img_formats[0]
-            else:
-                return None
+        if len(first_with_format):
+            return next(iter(first_with_format))
         else:
             return None
@@ -12,7 +12,8 @@ from tqdm import tqdm
 
 import slideflow as sf
 from slideflow import errors
-from slideflow.io.io_utils import detect_tfrecord_format
+from slideflow.io.io_utils import (detect_tfrecord_format,
+                                   detect_tfrecord_img_format)
 from slideflow.util import colors as col
 from slideflow.util import log
 
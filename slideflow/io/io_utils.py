@@ -1,6 +1,5 @@
 from __future__ import absolute_import
 
-import imghdr
 import io
 import os
 import struct
@@ -9,6 +8,19 @@ from typing import List, Optional, Tuple
 from slideflow import errors
 from slideflow.util import example_pb2, extract_feature_dict, log
 
+_IMG_SIGNATURES = {
+    'png': b'\x89PNG\r\n\x1a\n',
+    'jpeg': b'\xff\xd8\xff',
+}
+
+
+def _img_format(img: bytes) -> Optional[str]:
+    """Returns the image format (png/jpeg) from its leading signature."""
+    for fmt, sig in _IMG_SIGNATURES.items():
+        if img.startswith(sig):
+            return fmt
+    return None
+
 
 def detect_tfrecord_format(tfr: str) -> Tuple[Optional[List[str]],
                                               Optional[str]]:
@@ -78,6 +90,42 @@ def detect_tfrecord_format(tfr: str) -> Tuple[Optional[List[str]],
             raise errors.TFRecordsError(
                 f'Unable to detect TFRecord format: {tfr}'
             )
-    img = bytes(record['image_raw'])
-    img_type = imghdr.what('', img)
+    img_type = _img_format(bytes(record['image_raw']))
     return list(feature_description.keys()), img_type
+
+
+def detect_tfrecord_img_format(tfr: str) -> Optional[str]:
+    '''Detects the image format of a tfrecord from its first record.
+
+    Searches the raw bytes of the first record for a PNG or JPEG signature,
+    rather than parsing the record. Falls back to
+    :func:`detect_tfrecord_format` if neither signature is found.
+
+    Args:
+        tfr (str): Path to tfrecord.
+
+    Returns:
+        str: Image file type (png/jpeg), or None if the tfrecord is empty.
+    '''
+    with io.open(tfr, 'rb') as file:
+        length_bytes = file.read(8)
+        if not length_bytes:
+            log.debug(f"Unable to detect format for {tfr}; file empty.")
+            return None
+        if len(length_bytes) != 8:
+            raise RuntimeError("Failed to read the record size.")
+        length, = struct.unpack("<Q", length_bytes)
+        file.seek(4, os.SEEK_CUR)  # Skip the length CRC
+        record = file.read(length)
+    if len(record) != length:
+        raise RuntimeError("Failed to read the record.")
+
+    # The other features (slide name and tile locations) are short strings
+    # and integers, so the first signature found is the start of the image.
+    found = {
+        fmt: record.find(sig) for fmt, sig in _IMG_SIGNATURES.items()
+    }
+    found = {fmt: pos for fmt, pos in found.items() if pos != -1}
+    if not found:
+        return detect_tfrecord_format(tfr)[-1]
+    return min(found, key=found.get)  # type: ignore
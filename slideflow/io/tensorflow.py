@@ -2,6 +2,8 @@ import os
 import shutil
 from functools import partial
 from glob import glob
+from itertools import islice
+from multiprocessing.dummy import Pool as DPool
 from os import listdir
 from os.path import exists, isfile, join
 from random import randint, shuffle
@@ -33,6 +35,10 @@ FEATURE_DESCRIPTION = {
     'loc_y': tf.io.FixedLenFeature([], tf.int64)
 }
 
+# Number of tiles in the shuffle buffer used to reshuffle cached tiles
+# between passes of an infinite dataset.
+_CACHE_SHUFFLE_BUFFER = 1024
+
 
 def _bytes_feature(value: bytes) -> "Feature":
     """Returns a bytes_list from a string / byte."""
@@ -44,6 +50,73 @@ def _int64_feature(value: int) -> "Feature":
     return tf.train.Feature(int64_list=tf.train.Int64List(value=[value]))
 
 
+def _pb_varint(value: int) -> bytes:
+    """Encodes an integer as a protobuf varint (negative as 64-bit)."""
+    value = int(value) & 0xFFFFFFFFFFFFFFFF
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _pb_field(tag: bytes, payload: bytes) -> bytes:
+    """Encodes a length-delimited protobuf field with the given tag."""
+    return tag + _pb_varint(len(payload)) + payload
+
+
+# Tags of length-delimited protobuf fields 1-3, used to encode the nested
+# Example > Features > map entry > Feature > BytesList/Int64List messages.
+_PB_FIELD_1 = b'\x0a'
+_PB_FIELD_2 = b'\x12'
+_PB_FIELD_3 = b'\x1a'
+
+
+def _pb_feature_key(key: str) -> bytes:
+    return _pb_field(_PB_FIELD_1, key.encode('utf-8'))
+
+
+_PB_SLIDE_KEY = _pb_feature_key('slide')
+_PB_IMAGE_KEY = _pb_feature_key('image_raw')
+_PB_LOC_X_KEY = _pb_feature_key('loc_x')
+_PB_LOC_Y_KEY = _pb_feature_key('loc_y')
+
+
+def _pb_bytes_feature(key: bytes, value: bytes) -> bytes:
+    """Encodes a Features map entry holding a single-value BytesList."""
+    feature = _pb_field(_PB_FIELD_1, _pb_field(_PB_FIELD_1, value))
+    return _pb_field(_PB_FIELD_1, key + _pb_field(_PB_FIELD_2, feature))
+
+
+def _pb_int64_feature(key: bytes, value: int) -> bytes:
+    """Encodes a Features map entry holding a single-value Int64List."""
+    feature = _pb_field(_PB_FIELD_3, _pb_field(_PB_FIELD_1, _pb_varint(value)))
+    return _pb_field(_PB_FIELD_1, key + _pb_field(_PB_FIELD_2, feature))
+
+
+def _map_records(
+    fn: Callable,
+    records: Iterable,
+    chunksize: int = 1024
+) -> Iterable:
+    """Maps a function over records with a thread pool, preserving order.
+
+    Records are processed in chunks, so that at most one chunk of records
+    is held in memory at a time.
+    """
+    records = iter(records)
+    pool = DPool(min(32, os.cpu_count() or 8))
+    try:
+        while True:
+            chunk = list(islice(records, chunksize))
+            if not chunk:
+                break
+            yield from pool.map(fn, chunk)
+    finally:
+        pool.close()
+
+
 def read_and_return_record(
     record: bytes,
     parser: Callable,
@@ -150,6 +223,109 @@ def process_image(
         return tuple([image] + list(args))
 
 
+@tf.function
+def process_batch(
+    record: Union[tf.Tensor, Dict[str, tf.Tensor]],
+    *args: Any,
+    standardize: bool = False,
+    augment: bool = False,
+) -> Tuple[Union[Dict, tf.Tensor], ...]:
+    """Applies augmentations and/or standardization to a batch of images.
+
+    Batched equivalent of :func:`process_image`. Each augmentation is
+    randomized per image, with the same probabilities as
+    :func:`process_image`, but is applied to the whole batch at once.
+    Images must be square.
+    """
+
+    if isinstance(record, dict):
+        image = record['tile_image']
+    else:
+        image = record
+    batch_size = tf.shape(image)[0]
+
+    def uniform(**kwargs):
+        return tf.random.uniform(
+            shape=[batch_size],  # pylint: disable=unexpected-keyword-arg
+            **kwargs
+        )
+
+    def per_image(mask):
+        return tf.reshape(mask, [-1, 1, 1, 1])
+
+    if augment is True or (isinstance(augment, str) and 'j' in augment):
+        # Augment with random compression; JPEG encoding is only
+        # available for single images.
+        def compress(args):
+            img, do_compress, quality = args
+            return tf.cond(
+                do_compress,
+                true_fn=lambda: tf.image.adjust_jpeg_quality(img, quality),
+                false_fn=lambda: img
+            )
+
+        compressed = tf.map_fn(
+            compress,
+            (
+                image,
+                uniform(minval=0, maxval=1, dtype=tf.float32) < 0.5,
+                uniform(minval=50, maxval=100, dtype=tf.int32)
+            ),
+            fn_output_signature=image.dtype
+        )
+        compressed.set_shape(image.shape)
+        image = compressed
+    if augment is True or (isinstance(augment, str) and 'r' in augment):
+        # Rotate randomly 0, 90, 180, 270 degrees
+        k = uniform(minval=0, maxval=4, dtype=tf.int32)
+        rotated = image
+        for i in range(1, 4):
+            rotated = tf.where(
+                per_image(k == i), tf.image.rot90(image, i), rotated
+            )
+        image = rotated
+    if augment is True or (isinstance(augment, str) and 'x' in augment):
+        image = tf.image.random_flip_left_right(image)
+    if augment is True or (isinstance(augment, str) and 'y' in augment):
+        image = tf.image.random_flip_up_down(image)
+    if augment is True or (isinstance(augment, str) and 'b' in augment):
+        # Augment with random gaussian blur (p=0.1), with sigma 0.5 (p=0.5),
+        # 1.0 (p=0.25), 1.5 (p=0.125) or 2.0 (p=0.125). Only the selected
+        # images are blurred.
+        def blur(image, idx, sigma):
+            # Gaussian padding fails on an empty batch, so only blur
+            # if at least one image was selected.
+            return tf.cond(
+                tf.size(idx) > 0,
+                true_fn=lambda: tf.tensor_scatter_nd_update(
+                    image,
+                    idx,
+                    gaussian.auto_gaussian(
+                        tf.gather_nd(image, idx), sigma=sigma
+                    )
+                ),
+                false_fn=lambda: image
+            )
+
+        do_blur = uniform(minval=0, maxval=1, dtype=tf.float32) < 0.1
+        sigma_p = uniform(minval=0, maxval=1, dtype=tf.float32)
+        for sigma, low, high in ((0.5, 0., 0.5),
+                                 (1.0, 0.5, 0.75),
+                                 (1.5, 0.75, 0.875),
+                                 (2.0, 0.875, 1.)):
+            idx = tf.where(do_blur & (sigma_p >= low) & (sigma_p < high))
+            image = blur(image, idx, sigma)
+    if standardize:
+        image = tf.image.per_image_standardization(image)
+
+    if isinstance(record, dict):
+        to_return = {k: v for k, v in record.items() if k != 'tile_image'}
+        to_return['tile_image'] = image
+        return tuple([to_return] + list(args))
+    else:
+        return tuple([image] + list(args))
+
+
 @tf.function
 def decode_image(
     img_string: bytes,
@@ -176,7 +352,9 @@ def decode_image(
             Defaults to 'lanczos3'.
         resize_aa (bool, optional): If resizing, use antialiasing.
             Defaults to True.
-        size (int, optional): Set the image size/width (pixels).
+        size (int, optional): Set the image size/width (pixels). If
+            resizing an uncropped JPEG, is also used to decode directly at
+            a reduced scale (1/2, 1/4, or 1/8) before the final resize.
             Defaults to None.
 
     Returns:
@@ -188,7 +366,20 @@ def decode_image(
         'jpg': tf.image.decode_jpeg
     }
     decoder = tf_decoders[img_type.lower()]
-    image = decoder(img_string, channels=3)
+    ratio = 1
+    if (img_type.lower() in ('jpeg', 'jpg')
+       and crop_left is None
+       and resize_target is not None
+       and size):
+        # Downscale during the JPEG IDCT by the largest factor that
+        # keeps the image at least as large as the resize target.
+        ratio = max((r for r in (2, 4, 8)
+                     if not size % r and size // r >= resize_target),
+                    default=1)
+    if ratio > 1:
+        image = decoder(img_string, channels=3, ratio=ratio)
+    else:
+        image = decoder(img_string, channels=3)
     if crop_left is not None:
         image = tf.image.crop_to_bounding_box(
             image, crop_left, crop_left, crop_width, crop_width
@@ -291,24 +482,27 @@ def parser_from_labels(labels: Labels) -> Callable:
     slides = list(labels.keys())
     if len(outcome_labels.shape) == 1:
         outcome_labels = np.expand_dims(outcome_labels, axis=1)
+    n_outcomes = outcome_labels.shape[1]
+    # Slides not in the labels are mapped to a final row of -1
+    outcome_labels = np.concatenate([
+        outcome_labels,
+        np.full((1, n_outcomes), -1, dtype=outcome_labels.dtype)
+    ])
     with tf.device('/cpu'):
-        annotations_tables = []
-        for oi in range(outcome_labels.shape[1]):
-            annotations_tables += [tf.lookup.StaticHashTable(
-                tf.lookup.KeyValueTensorInitializer(
-                    slides,
-                    outcome_labels[:, oi]
-                ), -1
-            )]
+        slide_index = tf.lookup.StaticHashTable(
+            tf.lookup.KeyValueTensorInitializer(
+                slides,
+                tf.range(len(slides), dtype=tf.int64)
+            ), len(slides)
+        )
+        labels_tensor = tf.constant(outcome_labels)
 
     def label_parser(image, slide):
-        if outcome_labels.shape[1] > 1:
-            label = [
-                annotations_tables[oi].lookup(slide)
-                for oi in range(outcome_labels.shape[1])
-            ]
+        label = tf.gather(labels_tensor, slide_index.lookup(slide))
+        if n_outcomes > 1:
+            label = tf.unstack(label, num=n_outcomes)
         else:
-            label = annotations_tables[0].lookup(slide)
+            label = label[0]
         return image, label
 
     return label_parser
@@ -332,6 +526,8 @@ def interleave(
     num_parallel_reads: int = 4,
     deterministic: bool = False,
     drop_last: bool = False,
+    cache: Optional[str] = None,
+    round_robin: bool = False,
     **decode_kwargs: Any
 ) -> Iterable:
 
@@ -376,7 +572,9 @@ def interleave(
         shard_idx (int, optional): Index of the tfrecord shard to use.
             Defaults to None.
         num_parallel_reads (int, optional): Number of parallel reads for each
-            TFRecordDataset. Defaults to 4.
+            TFRecordDataset. Without prob_weights, tfrecords are read in
+            parallel if this is set, and sequentially if None.
+            Defaults to 4.
         deterministic (bool, optional): When num_parallel_calls is specified,
             if this boolean is specified, it controls the order in which the
             transformation produces elements. If set to False, the
@@ -384,9 +582,25 @@ def interleave(
             determinism for performance. Defaults to False.
         drop_last (bool, optional): Drop the last non-full batch.
             Defaults to False.
+        cache (str, optional): Cache decoded tiles, before augmentation,
+            to this file. If an empty string, caches in memory. If infinite,
+            the cached tiles are repeated, rather than each tfrecord, and
+            are reshuffled for each pass with a buffer of 1024 tiles.
+            Finite datasets replay the order of the first pass when
+            iterated again. Cannot be used with prob_weights for infinite
+            datasets. Defaults to None (no caching).
+        round_robin (bool, optional): Without prob_weights, read tiles in
+            turn from up to 32 tfrecords at a time with a single parallel
+            interleave, in a random tfrecord order for each pass, rather
+            than drawing each tile from a tfrecord selected at random.
+            Defaults to False.
     """
     if not len(tfrecords):
         raise errors.TFRecordsNotFoundError
+    if cache is not None and infinite and prob_weights:
+        raise ValueError(
+            "Cannot cache an infinite dataset sampled with prob_weights."
+        )
     log.debug(
         f'Interleaving {len(tfrecords)} tfrecords: infinite={infinite}, '
         f'num_parallel_reads={num_parallel_reads}'
@@ -422,70 +636,150 @@ def interleave(
                 img_size=img_size,
                 **decode_kwargs
             )
-        datasets = []
-        weights = [] if prob_weights else None  # type: Optional[List]
-        for tfr in tqdm(tfrecords, desc='Interleaving...', leave=False):
-            tf_dts = tf.data.TFRecordDataset(
-                tfr,
-                num_parallel_reads=num_parallel_reads
-            )
+
+        # ------- Read each tfrecord ------------------------------------------
+        clip_to = [
+            clip[tfr] // (num_shards if num_shards else 1) if clip else -1
+            for tfr in tfrecords
+        ]
+
+        def read_tfrecord(tfr, n_take, num_reads=None, repeat=False):
+            tf_dts = tf.data.TFRecordDataset(tfr, num_parallel_reads=num_reads)
             if num_shards:
                 tf_dts = tf_dts.shard(num_shards, index=shard_idx)
-            if clip:
-                tf_dts = tf_dts.take(
-                    clip[tfr] // (num_shards if num_shards else 1)
-                )
-            if infinite:
+            tf_dts = tf_dts.take(n_take)
+            if repeat:
                 tf_dts = tf_dts.repeat()
-            datasets += [tf_dts]
-            if prob_weights:
-                weights += [prob_weights[tfr]]  # type: ignore
+            return tf_dts
 
         # ------- Interleave and parse datasets -------------------------------
-        sampled_dataset = tf.data.experimental.sample_from_datasets(
-            datasets,
-            weights=weights
-        )
+        if round_robin and not prob_weights:
+            # Read from a bounded number of tfrecords at a time, so that
+            # memory does not grow with the number of tfrecords. Infinite
+            # datasets repeat whole passes, so that all tfrecords are read.
+            sampled_dataset = tf.data.Dataset.from_tensor_slices(
+                (tfrecords, tf.constant(clip_to, dtype=tf.int64))
+            ).shuffle(
+                len(tfrecords)
+            ).interleave(
+                read_tfrecord,
+                cycle_length=min(len(tfrecords), 32),
+                block_length=1,
+                num_parallel_calls=(tf.data.AUTOTUNE if num_parallel_reads
+                                    else None),
+                deterministic=deterministic
+            )
+            if infinite and cache is None:
+                sampled_dataset = sampled_dataset.repeat()
+        else:
+            # Draw each record from a tfrecord chosen at random, according
+            # to its weight if provided.
+            datasets = [
+                read_tfrecord(
+                    tfr,
+                    n_take,
+                    num_parallel_reads,
+                    repeat=(infinite and cache is None)
+                )
+                for tfr, n_take in tqdm(zip(tfrecords, clip_to),
+                                        desc='Interleaving...',
+                                        total=len(tfrecords),
+                                        leave=False)
+            ]
+            sampled_dataset = tf.data.experimental.sample_from_datasets(
+                datasets,
+                weights=([prob_weights[tfr] for tfr in tfrecords]
+                         if prob_weights else None)
+            )
+        # ------- Parse, normalize, standardize and augment images -----------
+        # Per-image steps are fused into the parsing map. When batching,
+        # images are batched before vectorized normalization and
+        # augmentation, so that each operation is applied once per batch.
+        vectorized_norm = normalizer is not None and normalizer.vectorized
+        per_image_norm = normalizer is not None and not normalizer.vectorized
+        process_per_image = (not batch_size
+                             and not vectorized_norm
+                             and cache is None)
+        if per_image_norm:
+            log.info("Using slow, per-image normalization")
+
+        def process_fn(image):
+            if per_image_norm:
+                image = normalizer.tf_to_tf(image)  # type: ignore
+            if process_per_image:
+                image = process_image(
+                    image, standardize=standardize, augment=augment
+                )[0]
+            return image
+
         dataset = _get_parsed_datasets(
             sampled_dataset,
             base_parser=base_parser,  # type: ignore
             label_parser=label_parser,
             include_slidenames=incl_slidenames,
             include_loc=incl_loc,
-            deterministic=deterministic
+            deterministic=deterministic,
+            process_fn=(process_fn if per_image_norm or process_per_image
+                        else None)
         )
-        # ------- Apply normalization -----------------------------------------
-        if normalizer and normalizer.vectorized:
+        if cache is not None:
+            dataset = dataset.cache(cache)
+            if infinite:
+                # The cache replays the tile order of the first pass, so
+                # reshuffle tiles for each subsequent pass.
+                dataset = dataset.shuffle(_CACHE_SHUFFLE_BUFFER)
+                dataset = dataset.repeat()
+        if batch_size:
+            dataset = dataset.batch(batch_size, drop_remainder=drop_last)
+        if vectorized_norm:
             log.info("Using fast, vectorized normalization")
-            norm_batch_size = 32 if not batch_size else batch_size
-            dataset = dataset.batch(norm_batch_size, drop_remainder=drop_last)
+            if not batch_size:
+                dataset = dataset.batch(32, drop_remainder=drop_last)
             dataset = dataset.map(
                 normalizer.batch_to_batch,  # type: ignore
                 num_parallel_calls=tf.data.AUTOTUNE,
                 deterministic=deterministic
             )
-            dataset = dataset.unbatch()
-        elif normalizer:
-            log.info("Using slow, per-image normalization")
+            if not batch_size:
+                dataset = dataset.unbatch()
+        if not process_per_image:
             dataset = dataset.map(
-                normalizer.tf_to_tf,
+                partial(
+                    process_batch if batch_size else process_image,
+                    standardize=standardize,
+                    augment=augment
+                ),
                 num_parallel_calls=tf.data.AUTOTUNE,
                 deterministic=deterministic
             )
-        # ------- Standardize and augment images ------------------------------
-        dataset = dataset.map(
-            partial(
-                process_image,
-                standardize=standardize,
-                augment=augment
-            ),
-            num_parallel_calls=tf.data.AUTOTUNE,
-            deterministic=deterministic
-        )
-        # ------- Batch and prefetch ------------------------------------------
-        if batch_size:
-            dataset = dataset.batch(batch_size, drop_remainder=drop_last)
-        dataset = dataset.prefetch(tf.data.AUTOTUNE)
+        # ------- Pipeline options --------------------------------------------
+        options = tf.data.Options()
+        options.deterministic = deterministic
+        options.experimental_optimization.map_and_batch_fusion = True
+        options.experimental_optimization.map_parallelization = True
+        options.experimental_optimization.parallel_batch = True
+        options.threading.private_threadpool_size = os.cpu_count() or 0
+        dataset = dataset.with_options(options)
+        # ------- Prefetch ----------------------------------------------------
+        # When training on a single GPU, prefetch batches directly into GPU
+        # memory so that host-to-device copies overlap with the model step.
+        # This must be the final transformation, so is only used for
+        # infinite (training) datasets, which are not repeated by callers.
+        # Distributed datasets must remain on the host, and slide names
+        # (strings) cannot be placed on the GPU.
+        if (batch_size
+           and infinite
+           and not incl_slidenames
+           and not tf.distribute.has_strategy()
+           and len(tf.config.list_logical_devices('GPU')) == 1):
+            dataset = dataset.apply(
+                tf.data.experimental.prefetch_to_device(
+                    '/gpu:0',
+                    buffer_size=tf.data.AUTOTUNE
+                )
+            )
+        else:
+            dataset = dataset.prefetch(tf.data.AUTOTUNE)
 
         return dataset
 
@@ -496,7 +790,8 @@ def _get_parsed_datasets(
     label_parser: Optional[Callable] = None,
     include_slidenames: bool = False,
     include_loc: Optional[str] = None,
-    deterministic: bool = False
+    deterministic: bool = False,
+    process_fn: Optional[Callable] = None
 ) -> tf.data.Dataset:
     """Return a parsed dataset.
 
@@ -514,6 +809,8 @@ def _get_parsed_datasets(
             follow slide names. Defaults to None.
         deterministic (bool, optional): Read from TFRecords in order, at the
             expense of performance. Defaults to False.
+        process_fn (Optional[Callable], optional): Function applied to each
+            decoded image, in the same map as parsing. Defaults to None.
 
     Returns:
         tf.data.Dataset: Parsed dataset.
@@ -524,6 +821,8 @@ def _get_parsed_datasets(
             image, slide, loc_x, loc_y = base_parser(record)
         else:
             image, slide = base_parser(record)
+        if process_fn is not None:
+            image = process_fn(image)
         image, label = label_parser(image, slide) if label_parser else (image, None)
 
         to_return = [image, label]
@@ -563,8 +862,19 @@ def serialized_record(
     loc_y: int = 0
 ) -> bytes:
     '''Returns a serialized example for TFRecord storage, ready to be written
-    by a TFRecordWriter.'''
-    return tfrecord_example(slide, image_raw, loc_x, loc_y).SerializeToString()
+    by a TFRecordWriter.
+
+    Encodes the protobuf wire format directly, rather than building a
+    tf.train.Example. The result parses to the same Example as
+    :func:`tfrecord_example`.
+    '''
+    features = b''.join((
+        _pb_bytes_feature(_PB_SLIDE_KEY, slide),
+        _pb_bytes_feature(_PB_IMAGE_KEY, image_raw),
+        _pb_int64_feature(_PB_LOC_X_KEY, loc_x),
+        _pb_int64_feature(_PB_LOC_Y_KEY, loc_y)
+    ))
+    return _pb_field(_PB_FIELD_1, features)
 
 
 def multi_image_example(slide: bytes, image_dict: Dict) -> "Example":
@@ -589,8 +899,7 @@ def join_tfrecord(
     writer = tf.io.TFRecordWriter(output_file)
     tfrecord_files = glob(join(input_folder, "*.tfrecords"))
     datasets = []
-    if assign_slide:
-        slide = assign_slide.encode('utf-8')
+    slide = assign_slide.encode('utf-8') if assign_slide else None
     features, img_type = detect_tfrecord_format(tfrecord_files[0])
     parser = get_tfrecord_parser(
         tfrecord_files[0],
@@ -607,16 +916,22 @@ def join_tfrecord(
         dataset = dataset.shuffle(1000)
         dataset_iter = iter(dataset)
         datasets += [dataset_iter]
-    while len(datasets):
-        index = randint(0, len(datasets)-1)
-        try:
-            record = next(datasets[index])
-        except StopIteration:
-            del(datasets[index])
-            continue
-        writer.write(
-            read_and_return_record(record, parser, slide)  # type: ignore
-        )
+
+    def sample_records():
+        while len(datasets):
+            index = randint(0, len(datasets)-1)
+            try:
+                yield next(datasets[index])
+            except StopIteration:
+                del(datasets[index])
+
+    # Records are re-serialized in parallel, in the sampled order
+    for serialized in _map_records(
+        partial(read_and_return_record, parser=parser, assign_slide=slide),
+        sample_records()
+    ):
+        writer.write(serialized)
+    writer.close()
 
 
 def split_tfrecord(tfrecord_file: str, output_folder: str) -> None:
@@ -630,19 +945,21 @@ def split_tfrecord(tfrecord_file: str, output_folder: str) -> None:
         decode_images=False,
         to_numpy=True
     )
-    writers = {}  # type: ignore
-    for record in dataset:
+
+    def split_record(record):
         slide = parser(record)  # type: ignore
         shortname = sf.util._shortname(slide.decode('utf-8'))
+        return shortname, read_and_return_record(record, full_parser)
+
+    writers = {}  # type: ignore
+    for shortname, serialized in _map_records(split_record, dataset):
         if shortname not in writers.keys():
             tfrecord_path = join(output_folder, f"{shortname}.tfrecords")
             writer = tf.io.TFRecordWriter(tfrecord_path)
             writers.update({shortname: writer})
         else:
             writer = writers[shortname]
-        writer.write(
-            read_and_return_record(record, full_parser)  # type: ignore
-        )
+        writer.write(serialized)
     for slide in writers.keys():
         writers[slide].close()
 
@@ -777,7 +1094,7 @@ def transform_tfrecord(
         else:
             return image_string
 
-    for record in dataset:
+    def transform_record(record):
         slide, image_raw, loc_x, loc_y = parser(record)  # type: ignore
         slidename = slide if not assign_slide else bytes(assign_slide, 'utf-8')
         image_processed_data = process_image(image_raw)
@@ -787,7 +1104,10 @@ def transform_tfrecord(
             loc_x,
             loc_y
         )
-        writer.write(tf_example.SerializeToString())
+        return tf_example.SerializeToString()
+
+    for serialized in _map_records(transform_record, dataset):
+        writer.write(serialized)
     writer.close()
 
 
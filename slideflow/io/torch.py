@@ -1,9 +1,8 @@
 import multiprocessing as mp
-import os
 import random
 import threading
 from os import listdir
-from os.path import dirname, exists, isfile, join
+from os.path import dirname, isfile, join
 from queue import Queue
 from typing import (TYPE_CHECKING, Any, Callable, Dict, Iterable, List,
                     Optional, Tuple, Union)
@@ -15,7 +14,7 @@ import torchvision
 from slideflow import errors
 from slideflow.io.io_utils import detect_tfrecord_format
 from slideflow.tfrecord.torch.dataset import MultiTFRecordDataset
-from slideflow.util import Labels, log, to_onehot
+from slideflow.util import Labels, log, tfrecord2idx, to_onehot
 from tqdm import tqdm
 
 import torch
@@ -105,7 +104,7 @@ class InterleaveIterator(torch.utils.data.IterableDataset):
                 (for StyleGAN2). Not required. Defaults to 'categorical'.
             onehot (bool, optional): Onehot encode outcomes. Defaults to False.
             indices (numpy.ndarray, optional): Indices in form of array,
-                with np.loadtxt(index_path, dtype=np.int64) for each tfrecord.
+                as loaded by ``tfrecord2idx.load_index()`` for each tfrecord.
                 Defaults to None.
             max_size (bool, optional): Unused argument present for legacy
                 compatibility; will be removed.
@@ -680,15 +679,12 @@ def interleave(
         def load_index(tfr):
             tfr = tfr.decode('utf-8')
             index_name = join(dirname(tfr), sf.util.path_to_name(tfr)+'.index')
-            if not exists(index_name):
+            try:
+                return tfrecord2idx.load_index(index_name)
+            except FileNotFoundError:
                 raise errors.TFRecordsError(
                     f"Could not find index path for TFRecord {tfr}"
                 )
-            if os.stat(index_name).st_size == 0:
-                index = None
-            else:
-                index = np.loadtxt(index_name, dtype=np.int64)
-            return index
 
         pool = mp.dummy.Pool(16)
         if rank == 0:
@@ -1230,6 +1230,10 @@ class Project:
                 Defaults to None.
             report (bool, optional): Save a PDF report of tile extraction.
                 Defaults to True.
+            estimate_tiles (bool, optional): Open each slide before
+                extraction to estimate the total number of tiles, used for
+                the progress bar. Disable to skip this step on large
+                datasets. Defaults to True.
 
         Keyword Args:
             normalizer (str, optional): Normalization strategy.
@@ -10,7 +10,7 @@ from typing import Optional
 import slideflow as sf
 import slideflow.test.functional
 from slideflow import errors
-from slideflow.test import dataset_test, slide_test, stats_test
+from slideflow.test import dataset_test, io_test, slide_test, stats_test
 from slideflow.test.utils import (TaskWrapper, TestConfig,
                                   _assert_valid_results, process_isolate)
 from slideflow.util import colors as col
@@ -777,7 +777,7 @@ class TestSuite:
         runner = unittest.TextTestRunner()
         all_tests = [
             unittest.TestLoader().loadTestsFromModule(module)
-            for module in (dataset_test, stats_test)
+            for module in (dataset_test, io_test, stats_test)
         ]
         suite = unittest.TestSuite(all_tests)
 
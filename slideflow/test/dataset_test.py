@@ -1,7 +1,11 @@
+import csv
 import logging
 import random
 import shutil
+import tempfile
 import unittest
+from os.path import join
+from unittest import mock
 
 import pandas as pd
 import slideflow as sf
@@ -37,6 +41,20 @@ class TestDataset(unittest.TestCase):
         dataset.load_annotations(ann_df)
         self.assertTrue(len(dataset.annotations) == 100)
 
+    def test_load_annotations_keeps_string_values(self):
+        dataset = self.PROJECT.dataset()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ann_path = join(tmpdir, 'annotations.csv')
+            with open(ann_path, 'w') as f:
+                f.write('patient,slide,id,linear\n')
+                f.write('007,slide007,0001,1e5\n')
+                f.write('pt1,slide1,,NA\n')
+            dataset.load_annotations(ann_path)
+        self.assertEqual(
+            dataset.annotations.values.tolist(),
+            [['007', 'slide007', '0001', '1e5'], ['pt1', 'slide1', '', '']]
+        )
+
     def test_load_faulty_annotations_with_duplicates(self):
         dataset = self.PROJECT.dataset()
         ann_df = pd.DataFrame({
@@ -77,6 +95,21 @@ class TestDataset(unittest.TestCase):
         dataset = self.PROJECT.dataset()
         self.assertRaises(sf.errors.DatasetBalanceError, dataset.balance, 'category1')
 
+    def test_remove_filter(self):
+        dataset = self.PROJECT.dataset()
+        filtered = dataset.filter(
+            filters={'category1': ['A']},
+            filter_blank=['category2']
+        )
+        removed = filtered.remove_filter(
+            filters=['category1'],
+            filter_blank=['category2']
+        )
+        self.assertFalse(removed.filters)
+        self.assertFalse(removed.filter_blank)
+        self.assertEqual(filtered.filter_blank, ['category2'])
+        self.assertIn('category1', filtered.filters)
+
     def test_is_float(self):
         dataset = self.PROJECT.dataset()
         self.assertTrue(dataset.is_float('linear1'))
@@ -84,6 +117,94 @@ class TestDataset(unittest.TestCase):
         self.assertFalse(dataset.is_float('category1'))
         self.assertFalse(dataset.is_float('category2'))
 
+    def _seeded_train_val_split(self, seed, **kwargs):
+        dataset = self.PROJECT.dataset()
+        labels, _ = dataset.labels('category1')
+        tfrecords = {s: f'{s}.tfrecords' for s in dataset.slides()}
+
+        def filtered_tfrecords(dts, *args, **kw):
+            slides = dts.filters.get('slide', list(tfrecords))
+            return [tfrecords[s] for s in slides]
+
+        with mock.patch.object(sf.Dataset, 'tfrecords', autospec=True,
+                               side_effect=filtered_tfrecords):
+            train_dts, val_dts = dataset.train_val_split(
+                'categorical',
+                labels,
+                read_only=True,
+                seed=seed,
+                **kwargs
+            )
+            return train_dts.tfrecords(), val_dts.tfrecords()
+
+    def _test_seeded_split(self, **kwargs):
+        first = self._seeded_train_val_split(seed=42, **kwargs)
+        second = self._seeded_train_val_split(seed=42, **kwargs)
+        self.assertEqual(first, second)
+        self.assertTrue(len(first[0]) and len(first[1]))
+
+    def test_seeded_fixed_split(self):
+        self._test_seeded_split(val_strategy='fixed', val_fraction=0.3)
+
+    def test_seeded_k_fold_split(self):
+        self._test_seeded_split(
+            val_strategy='k-fold', val_k_fold=3, k_fold_iter=2
+        )
+
+    def test_seeded_site_preserved_split(self):
+        dataset = self.PROJECT.dataset()
+        site_labels = {
+            s: f'site{i % 3}' for i, s in enumerate(dataset.slides())
+        }
+        try:
+            self._test_seeded_split(
+                val_strategy='k-fold-preserved-site',
+                val_k_fold=3,
+                k_fold_iter=2,
+                site_labels=site_labels
+            )
+        except sf.errors.CPLEXNotFoundError:
+            sf.util.log.error(
+                'CPLEX not installed, unable to test site-preserved '
+                'cross-validation.'
+            )
+
+    def _update_annotations_round_trip(self):
+        header = ['patient', 'slide', 'na', 'null', 'id', 'text']
+        rows = [
+            ['pt1', '', 'NA', 'null', '007', 'N/A'],
+            ['007', '', '#N/A', 'None', '0001', 'nan'],
+            ['pt3', 'existing', '', 'NULL', '1e5', 'a, "b"'],
+        ]
+        dataset = self.PROJECT.dataset()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ann_path = join(tmpdir, 'annotations.csv')
+            with open(ann_path, 'w', newline='') as f:
+                csv.writer(f).writerows([header] + rows)
+            slide_paths = [join(tmpdir, f'{s}.svs') for s in ('pt1', '007')]
+            with mock.patch.object(dataset, 'slide_paths',
+                                   return_value=slide_paths):
+                dataset.update_annotations_with_slidenames(ann_path)
+            with open(ann_path, newline='') as f:
+                updated = list(csv.reader(f))
+        rows[0][1] = 'pt1'
+        rows[1][1] = '007'
+        self.assertEqual(updated, [header] + rows)
+
+    def test_update_annotations_keeps_values(self):
+        self._update_annotations_round_trip()
+
+    def test_update_annotations_keeps_values_without_pyarrow(self):
+        read_csv = pd.read_csv
+
+        def read_csv_without_pyarrow(*args, **kwargs):
+            if kwargs.get('engine') == 'pyarrow':
+                raise ImportError
+            return read_csv(*args, **kwargs)
+
+        with mock.patch.object(sf.dataset.pd, 'read_csv',
+                               side_effect=read_csv_without_pyarrow):
+            self._update_annotations_round_trip()
 
 class TestSplits(unittest.TestCase):
 
@@ -167,6 +288,30 @@ class TestSplits(unittest.TestCase):
         splits = sf.dataset.split_patients(self.patients_dict, n=5)
         self._test_split(splits)
 
+    def test_append_split(self):
+        splits = [
+            {
+                'strategy': 'k-fold',
+                'patients': self.patients_dict,
+                'tfrecords': {
+                    'training': [f'pt{p}.tfrecords' for p in range(i, 50)],
+                    'validation': [f'pt{p}.tfrecords' for p in range(i)]
+                }
+            } for i in range(4)
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            appended_file = join(tmpdir, 'appended.json')
+            full_file = join(tmpdir, 'full.json')
+            sf.util.write_json(splits[:1], appended_file)
+            for i in range(2, len(splits) + 1):
+                sf.dataset._append_split(appended_file, splits[:i])
+                sf.util.write_json(splits[:i], full_file)
+                self.assertEqual(sf.util.load_json(appended_file), splits[:i])
+                with open(appended_file, 'rb') as f:
+                    appended_bytes = f.read()
+                with open(full_file, 'rb') as f:
+                    self.assertEqual(appended_bytes, f.read())
+
 
 class TestLabels(unittest.TestCase):
 
@@ -204,6 +349,12 @@ class TestLabels(unittest.TestCase):
         self.assertIsInstance(unique, list)
         self.assertTrue(all([isinstance(lbl, str) for lbl in unique]))
 
+    def test_harmonize_labels(self):
+        other = self.dataset.filter(filters={'category1': ['A']})
+        harmonized = self.dataset.harmonize_labels(other, header='category1')
+        _, unique = self.dataset.labels('category1')
+        self.assertEqual(harmonized, {lbl: i for i, lbl in enumerate(unique)})
+
     def _test_linear_labels(self, use_float):
         labels, unique = self.dataset.labels('linear1', use_float=use_float)
         self._check_label_format(labels)
@@ -0,0 +1,219 @@
+import logging
+import os
+import struct
+import tempfile
+import unittest
+from os.path import join
+
+import slideflow as sf
+from slideflow.util import tfrecord2idx
+
+
+def _legacy_create_index(tfrecord_file: str, index_file: str) -> None:
+    """Reference index, reading each record in turn as create_index()
+    originally did."""
+    infile = open(tfrecord_file, "rb")
+    outfile = open(index_file, "w")
+    while True:
+        cur = infile.tell()
+        try:
+            byte_len = infile.read(8)
+            if len(byte_len) == 0:
+                break
+            infile.read(4)
+            proto_len = struct.unpack("q", byte_len)[0]
+            infile.read(proto_len)
+            infile.read(4)
+            outfile.write(str(cur) + " " + str(infile.tell() - cur) + "\n")
+        except Exception:
+            break
+    infile.close()
+    outfile.close()
+
+
+class TestIndex(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def _write_tfrecord(self, records):
+        # Length, length CRC, data, and data CRC of each record. CRCs are
+        # not read when indexing, so are left empty.
+        path = join(self.tmpdir.name, 'test.tfrecords')
+        with open(path, 'wb') as f:
+            for data in records:
+                f.write(struct.pack('q', len(data)) + bytes(4))
+                f.write(data + bytes(4))
+        return path
+
+    def _assert_matches_legacy(self, tfrecord):
+        index = join(self.tmpdir.name, 'test.index')
+        legacy_index = join(self.tmpdir.name, 'legacy.index')
+        tfrecord2idx.create_index(tfrecord, index)
+        _legacy_create_index(tfrecord, legacy_index)
+        with open(index, 'rb') as f, open(legacy_index, 'rb') as legacy:
+            self.assertEqual(f.read(), legacy.read())
+
+    def test_create_index(self):
+        records = [os.urandom(n) for n in (100, 0, 1, 5000, 37)]
+        tfrecord = self._write_tfrecord(records)
+        self._assert_matches_legacy(tfrecord)
+        index = tfrecord2idx.load_index(join(self.tmpdir.name, 'test.index'))
+        self.assertEqual(index[:, 1].tolist(), [len(r) + 16 for r in records])
+
+    def test_create_index_empty(self):
+        tfrecord = self._write_tfrecord([])
+        self._assert_matches_legacy(tfrecord)
+
+    def test_create_index_truncated(self):
+        tfrecord = self._write_tfrecord([os.urandom(n) for n in (100, 200)])
+        size = os.path.getsize(tfrecord)
+        # Truncate within the last record, then within its header
+        for truncated_size in (size - 50, 128 + 5):
+            with open(tfrecord, 'r+b') as f:
+                f.truncate(truncated_size)
+            self._assert_matches_legacy(tfrecord)
+
+    def test_create_index_corrupt_length(self):
+        tfrecord = self._write_tfrecord([os.urandom(100)])
+        with open(tfrecord, 'ab') as f:
+            f.write(struct.pack('q', -1) + bytes(4) + os.urandom(100))
+        self._assert_matches_legacy(tfrecord)
+
+
+@unittest.skipIf(sf.backend() != 'tensorflow', 'Requires Tensorflow backend')
+class TestSerializedRecord(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._orig_logging_level = logging.getLogger('slideflow').getEffectiveLevel()  # type: ignore
+        logging.getLogger('slideflow').setLevel(40)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        logging.getLogger('slideflow').setLevel(cls._orig_logging_level)  # type: ignore
+
+    def _assert_matches_example(self, slide, image_raw, loc_x, loc_y):
+        import tensorflow as tf
+        from slideflow.io.tensorflow import (serialized_record,
+                                             tfrecord_example)
+
+        serialized = serialized_record(slide, image_raw, loc_x, loc_y)
+        parsed = tf.train.Example.FromString(serialized)
+        expected = tfrecord_example(slide, image_raw, loc_x, loc_y)
+        self.assertEqual(parsed, expected)
+
+    def test_default_locations(self):
+        self._assert_matches_example(b'slide', b'image', 0, 0)
+
+    def test_negative_locations(self):
+        self._assert_matches_example(b'slide', b'image', -1, -128)
+        self._assert_matches_example(b'slide', b'image', -2**40, -2**63)
+
+    def test_large_locations(self):
+        self._assert_matches_example(b'slide', b'image', 2**31, 2**40)
+        self._assert_matches_example(b'slide', b'image', 2**63 - 1, 127)
+
+    def test_empty_bytes(self):
+        self._assert_matches_example(b'slide', b'', 10, 20)
+        self._assert_matches_example(b'', b'', 10, 20)
+
+    def test_large_image(self):
+        image_raw = os.urandom(5 * 1024 * 1024)
+        self._assert_matches_example(b'slide', image_raw, 10, 20)
+
+
+@unittest.skipIf(sf.backend() != 'tensorflow', 'Requires Tensorflow backend')
+class TestLabelParser(unittest.TestCase):
+
+    def _parse(self, labels, slides):
+        import tensorflow as tf
+        from slideflow.io.tensorflow import parser_from_labels
+
+        label_parser = parser_from_labels(labels)
+        dataset = tf.data.Dataset.from_tensor_slices(
+            (tf.zeros(len(slides)), slides)
+        ).map(label_parser)
+        return [label for _, label in dataset]
+
+    def test_single_outcome(self):
+        labels = {'slide0': 0, 'slide1': 1, 'slide2': 2}
+        parsed = self._parse(labels, ['slide2', 'slide0', 'slide1'])
+        self.assertEqual([int(label) for label in parsed], [2, 0, 1])
+        self.assertTrue(all(label.shape == () for label in parsed))
+
+    def test_single_linear_outcome(self):
+        labels = {'slide0': [0.5], 'slide1': [1.5]}
+        parsed = self._parse(labels, ['slide1', 'slide0'])
+        self.assertEqual([float(label) for label in parsed], [1.5, 0.5])
+
+    def test_multi_outcome(self):
+        labels = {'slide0': [0, 1], 'slide1': [1, 0], 'slide2': [2, 2]}
+        parsed = self._parse(labels, ['slide1', 'slide2', 'slide0'])
+        self.assertTrue(all(len(label) == 2 for label in parsed))
+        self.assertEqual(
+            [[int(lbl) for lbl in label] for label in parsed],
+            [[1, 0], [2, 2], [0, 1]]
+        )
+
+    def test_unknown_slides(self):
+        parsed = self._parse({'slide0': 3}, ['slide0', 'unknown'])
+        self.assertEqual([int(label) for label in parsed], [3, -1])
+        parsed = self._parse({'slide0': [1, 2]}, ['unknown'])
+        self.assertEqual([int(lbl) for lbl in parsed[0]], [-1, -1])
+
+
+@unittest.skipIf(sf.backend() != 'tensorflow', 'Requires Tensorflow backend')
+class TestProcessBatch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        import tensorflow as tf
+        cls.images = tf.random.uniform(  # type: ignore
+            (8, 32, 32, 3), minval=0, maxval=256, dtype=tf.int32
+        )
+        cls.images = tf.cast(cls.images, tf.uint8)  # type: ignore
+
+    def _process_each(self, images, **kwargs):
+        import tensorflow as tf
+        from slideflow.io.tensorflow import process_image
+
+        return tf.stack([process_image(img, **kwargs)[0] for img in images])
+
+    def test_matches_process_image(self):
+        import numpy as np
+        from slideflow.io.tensorflow import process_batch
+
+        for standardize in (False, True):
+            batch, = process_batch(self.images, standardize=standardize)
+            expected = self._process_each(self.images, standardize=standardize)
+            self.assertEqual(batch.shape, expected.shape)
+            self.assertEqual(batch.dtype, expected.dtype)
+            np.testing.assert_allclose(batch, expected, rtol=1e-5, atol=1e-5)
+
+    def test_record_and_args(self):
+        from slideflow.io.tensorflow import process_batch
+
+        record = {'tile_image': self.images, 'slide': ['slide'] * 8}
+        processed, label = process_batch(record, 1, standardize=True)
+        self.assertEqual(label, 1)
+        self.assertEqual(set(processed.keys()), {'tile_image', 'slide'})
+        self.assertEqual(processed['tile_image'].shape, self.images.shape)
+
+    def test_augment_shape_and_dtype(self):
+        from slideflow.io.tensorflow import process_batch
+
+        for augment in (True, 'xyr', 'j', 'b'):
+            for standardize in (False, True):
+                batch, = process_batch(
+                    self.images, augment=augment, standardize=standardize
+                )
+                image, = self._process_each(
+                    self.images[:1], augment=augment, standardize=standardize
+                )
+                self.assertEqual(batch.shape, self.images.shape)
+                self.assertEqual(batch.dtype, image.dtype)
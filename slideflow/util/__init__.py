@@ -9,7 +9,7 @@ import shutil
 import sys
 import threading
 import time
-from functools import partial
+from functools import lru_cache, partial
 from glob import glob
 from os.path import dirname, exists, isdir, join
 from statistics import mean, median
@@ -31,6 +31,12 @@ try:
 except ImportError:
     git = None
 
+# Faster JSON parsing, if available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Enable color sequences on Windows
 try:
     import ctypes.windll
@@ -611,6 +617,15 @@ def choice_input(prompt, valid_choices, default=None, multi_choice=False,
 
 def load_json(filename: Path) -> Any:
     '''Reads JSON data from file.'''
+    if orjson is not None:
+        with open(filename, 'rb') as data_file:
+            data = data_file.read()
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson is strict; fall back for non-standard JSON written
+            # by the json module, such as NaN or Infinity.
+            return json.loads(data)
     with open(filename, 'r') as data_file:
         return json.load(data_file)
 
@@ -767,14 +782,16 @@ def contains_nested_subdirs(directory: Path) -> bool:
     return False
 
 
+@lru_cache(maxsize=65536)
 def path_to_name(path: str) -> str:
     '''Returns name of a file, without extension,
-    from a given full path string.'''
-    _file = path.split('/')[-1]
-    if len(_file.split('.')) == 1:
-        return _file
-    else:
-        return '.'.join(_file.split('.')[:-1])
+    from a given full path string.
+
+    Results are cached, as the same paths are converted repeatedly when
+    filtering and matching tfrecords, slides, and ROIs.'''
+    _file = path.rpartition('/')[2]
+    name, dot, _ = _file.rpartition('.')
+    return name if dot else _file
 
 
 def path_to_ext(path: str) -> str:
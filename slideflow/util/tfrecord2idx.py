@@ -1,7 +1,12 @@
 from __future__ import print_function
 
+import mmap
+import os
 import struct
 import sys
+from typing import Optional
+
+import numpy as np
 
 
 def create_index(tfrecord_file: str, index_file: str) -> None:
@@ -18,25 +23,96 @@ def create_index(tfrecord_file: str, index_file: str) -> None:
     index_file: str
         Path where to store the index file.
     """
-    infile = open(tfrecord_file, "rb")
-    outfile = open(index_file, "w")
+    offsets = []
+    lengths = []
+    with open(tfrecord_file, "rb") as infile:
+        size = os.fstat(infile.fileno()).st_size
+        if size:
+            # Walk the record headers in a memory map, skipping over the
+            # serialized records without reading them.
+            fd = infile.fileno()
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as data:
+                cur = 0
+                while cur < size:
+                    if cur + 8 > size:
+                        print("Failed to parse TFRecord.")
+                        break
+                    proto_len = struct.unpack_from("q", data, cur)[0]
+                    if proto_len < 0:
+                        # A corrupt length; the record spans the rest
+                        # of the file.
+                        end = size
+                    else:
+                        end = min(cur + 8 + 4 + proto_len + 4, size)
+                    offsets.append(cur)
+                    lengths.append(end - cur)
+                    cur = end
+    with open(index_file, "w") as outfile:
+        outfile.write("".join(
+            f"{o} {n}\n" for o, n in zip(offsets, lengths)
+        ))
+
+
+def load_index(
+    index_file: str,
+    mmap_mode: Optional[str] = None
+) -> Optional[np.ndarray]:
+    """Load a TFRecord index created by :func:`create_index`.
+
+    Parsing the text index is slow, so the parsed array is cached in a
+    binary ``.npy`` file alongside the index (``<index_file>.npy``, e.g.
+    ``slide.index.npy``). The first row of the binary copy records the
+    modification time and size of the text index it was parsed from, and
+    the binary copy is only used while both still match. It is (re)written
+    after the text index is parsed. If the binary copy cannot be written
+    (e.g. a read-only directory), the text index is parsed on each call.
+    Binary copies can be safely deleted, and are recreated when needed.
+
+    Params:
+    -------
+    index_file: str
+        Path to the index file.
+
+    mmap_mode: str, optional, default=None
+        If set (e.g. 'r'), memory-map the binary index rather than reading
+        it into memory. Only applies when the binary index is up to date.
 
-    while True:
-        cur = infile.tell()
+    Returns:
+    --------
+    np.ndarray or None: Array of (offset, length) pairs, or None if
+    the index is empty.
+    """
+    index_stat = os.stat(index_file)
+    if not index_stat.st_size:
+        return None
+    npy_file = index_file + ".npy"
+    header = [index_stat.st_mtime_ns, index_stat.st_size]
+    try:
+        cached = np.load(npy_file, mmap_mode=mmap_mode)
+        if cached.ndim == 2 and list(cached[0]) == header:
+            return _squeeze_index(cached[1:])
+    except (OSError, ValueError):
+        # Binary index is missing or unreadable; fall back to the text index.
+        pass
+    index = np.loadtxt(index_file, dtype=np.int64, ndmin=2)
+    # Write to a temporary file first, so that concurrent readers
+    # never see a partially written binary index.
+    tmp_file = f"{npy_file}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, "wb") as f:
+            np.save(f, np.concatenate([np.array([header], np.int64), index]))
+        os.replace(tmp_file, npy_file)
+    except OSError:
         try:
-            byte_len = infile.read(8)
-            if len(byte_len) == 0:
-                break
-            infile.read(4)
-            proto_len = struct.unpack("q", byte_len)[0]
-            infile.read(proto_len)
-            infile.read(4)
-            outfile.write(str(cur) + " " + str(infile.tell() - cur) + "\n")
-        except Exception:
-            print("Failed to parse TFRecord.")
-            break
-    infile.close()
-    outfile.close()
+            os.remove(tmp_file)
+        except OSError:
+            pass
+    return _squeeze_index(index)
+
+
+def _squeeze_index(index: np.ndarray) -> np.ndarray:
+    """Returns a single-record index as a 1D array, as np.loadtxt does."""
+    return index[0] if len(index) == 1 else index
 
 
 def main():